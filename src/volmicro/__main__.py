@@ -349,33 +349,34 @@ def main() -> None:
         f"Realized: {s['realized_pnl']:.2f} | Posición: {s['qty']} @ {s['avg_price']:.6f}"
     )
 
-    # Exportaciones (si el engine ya escribió, seguimos ok)
+    # Exportaciones: el engine ya las escribe en reports_dir (portfolio.reports_dir);
+    # solo se reconstruyen los DataFrames si falta algún CSV (p. ej. fallo al exportar).
     trades_csv = reports_dir / "trades.csv"
     equity_csv = reports_dir / "equity_curve.csv"
 
-    trades_df = portfolio.trades_dataframe()
-    if not trades_df.empty:
-        try:
-            trades_df.to_csv(trades_csv, index=False)
-            print(f"Trades exportados a {trades_csv}")
-        except Exception as e:
-            logging.getLogger(__name__).warning(f"No se pudo escribir trades.csv: {e}")
+    if trades_csv.exists():
+        print(f"Trades ya exportados por engine en {trades_csv}")
     else:
-        if trades_csv.exists():
-            print(f"Trades ya exportados por engine en {trades_csv}")
+        trades_df = portfolio.trades_dataframe()
+        if not trades_df.empty:
+            try:
+                trades_df.to_csv(trades_csv, index=False)
+                print(f"Trades exportados a {trades_csv}")
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"No se pudo escribir trades.csv: {e}")
         else:
             print("Sin trades.")
 
-    eq_df = portfolio.equity_curve_dataframe()
-    if not eq_df.empty:
-        try:
-            eq_df.to_csv(equity_csv, index=False)
-            print(f"Equity curve exportada a {equity_csv}")
-        except Exception as e:
-            logging.getLogger(__name__).warning(f"No se pudo escribir equity_curve.csv: {e}")
+    if equity_csv.exists():
+        print(f"Equity curve ya exportada por engine en {equity_csv}")
     else:
-        if equity_csv.exists():
-            print(f"Equity curve ya exportada por engine en {equity_csv}")
+        eq_df = portfolio.equity_curve_dataframe()
+        if not eq_df.empty:
+            try:
+                eq_df.to_csv(equity_csv, index=False)
+                print(f"Equity curve exportada a {equity_csv}")
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"No se pudo escribir equity_curve.csv: {e}")
         else:
             logging.getLogger(__name__).warning("Equity curve vacía; no se pudo exportar.")
 
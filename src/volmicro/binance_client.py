@@ -91,12 +91,17 @@ class BinanceClient:
     # exchange_info
     # ------------------------------------------------------------------
 
-    def exchange_info(self, symbol: str | None = None) -> dict[str, Any]:
+    def exchange_info(
+        self, symbol: str | None = None, symbols: list[str] | None = None
+    ) -> dict[str, Any]:
         """
-        Devuelve el `exchangeInfo` de Binance. Si `symbol` no es None, lo filtra.
+        Devuelve el `exchangeInfo` de Binance. Si `symbol` no es None, lo filtra; con
+        `symbols` pide varios símbolos en una sola llamada.
         """
         if symbol:
             return cast(dict[str, Any], self.client.exchange_info(symbol=symbol))
+        if symbols:
+            return cast(dict[str, Any], self.client.exchange_info(symbols=symbols))
         return cast(dict[str, Any], self.client.exchange_info())
 
     # ------------------------------------------------------------------
@@ -7,18 +7,24 @@ Responsabilidad
 Recorrer una secuencia de barras (iterable de `Bar`) y, para cada una:
 1) Marcar a mercado la cartera con el precio de cierre de la barra
    (mark-to-market).
-2) Registrar un punto de la **equity curve** (timestamp, equity).
+2) Registrar un punto de la **equity curve** (timestamp, equity) vía
+   `portfolio.record_equity(...)`.
 3) Invocar la lógica de la **estrategia**:
    `strategy.on_bar(bar, portfolio)`, la cual puede decidir comprar o vender
    usando la API del `Portfolio`.
 
+Si la estrategia declara `MODE = "vectorized"`, no hay bucle por barra: calcula sus
+señales de una vez (`vectorized_signals`) y el engine solo actúa en las barras con
+señal (`on_signal`); la equity curve entre señales se calcula en bloque (`_run_vectorized`).
+
 Al finalizar:
 - Si la estrategia implementa `on_finish(portfolio)` o `on_end(...)`, se llama.
 - Se asegura que la equity curve termina con un punto actualizado al equity
-  final.
+  final y se consolida su buffer por bloques (`portfolio.flush()`).
 - Si el `Portfolio` define `reports_dir` (ruta), se exportan:
     - reports_dir/equity_curve.csv  (siempre, a partir de los datos internos)
     - reports_dir/trades.csv        (si hay datos de trades accesibles)
+    - reports_dir/trades.parquet    (junto al CSV, si hay pyarrow: columnar y tipado)
 
 Interfaz
 --------
@@ -35,22 +41,22 @@ Notas de diseño
   binance_feed.iter_bars).
 - No acopla la estrategia: sólo exige `on_bar`. `on_finish`/`on_end` son
   opcionales.
-- Guarda la equity curve en memoria y la exporta si `portfolio.reports_dir`
-  está definido.
+- La equity curve vive en el `Portfolio` (arrays columnares) y se exporta si
+  `portfolio.reports_dir` está definido.
 """
 
 from __future__ import annotations
 
 import logging
 from collections.abc import Iterable
-from datetime import datetime
 from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
 from .core import Bar
-from .portfolio import Portfolio
+from .portfolio import PARQUET_AVAILABLE, Portfolio
 
 logger = logging.getLogger(__name__)
 
@@ -64,39 +70,59 @@ def run_engine(
     """
     Ejecuta el loop principal del backtest barra a barra.
     """
-    # Equity curve en memoria: lista de tuplas (timestamp, equity).
+    # La equity curve se acumula en el Portfolio (record_equity); aquí solo guardamos
+    # el último valor registrado para el chequeo de coherencia final.
     # El tipo de timestamp lo define Bar.ts (p. ej. int(ms) o datetime).
-    equity_curve: list[tuple[datetime, float]] = []
     last_bar: Bar | None = None
+    last_equity: float | None = None
+    n_bars = 0
+    record_equity = portfolio.record_equity
 
     # Prefijo de trazabilidad si el Portfolio trae run_id (útil en logs/CSV)
     run_id = getattr(portfolio, "run_id", None)
     log_prefix = f"[run:{run_id}] " if run_id else ""
 
-    # Bucle principal sobre las barras
-    for i, bar in enumerate(bars, start=1):
-        last_bar = bar  # mantenemos referencia a la última barra vista
-
-        # 1) Mark-to-market con el cierre de la barra
-        portfolio.mark_to_market(bar.close)
-
-        # 2) Registrar un punto de equity curve (tras MTM de esta barra)
-        equity_now = portfolio.equity()
-        equity_curve.append((bar.ts, equity_now))
-
-        # 3) Logging controlado
-        msg = (
-            f"{log_prefix}[{bar.ts}] {bar.symbol} i={i} "
-            f"close={bar.close:.8f} cash={portfolio.cash:.2f} "
-            f"qty={portfolio.qty:.8f} equity={equity_now:.2f}"
+    if getattr(strategy, "MODE", "iter") == "vectorized":
+        # Estrategia vectorizada: señales en una pasada sobre los arrays de barras
+        n_bars, last_bar, last_equity = _run_vectorized(
+            bars, portfolio, strategy, log_prefix, log_every
         )
-        if i == 1 or (log_every and log_every > 0 and i % log_every == 0):
-            logger.info(msg)
-        else:
-            logger.debug(msg)
-
-        # 4) Invocar la estrategia en esta barra
-        strategy.on_bar(bar, portfolio)
+    else:
+        # Bucle principal sobre las barras
+        for i, bar in enumerate(bars, start=1):
+            last_bar = bar  # mantenemos referencia a la última barra vista
+            n_bars = i
+
+            # 1) Mark-to-market con el cierre de la barra
+            portfolio.mark_to_market(bar.close)
+
+            # 2) Registrar un punto de equity curve (tras MTM de esta barra)
+            equity_now = portfolio.equity()
+            record_equity(bar.ts, equity_now)
+            last_equity = equity_now
+
+            # 3) Logging controlado (formato perezoso: solo se formatea si el nivel está activo)
+            level = (
+                logging.INFO
+                if i == 1 or (log_every and log_every > 0 and i % log_every == 0)
+                else logging.DEBUG
+            )
+            if logger.isEnabledFor(level):
+                logger.log(
+                    level,
+                    "%s[%s] %s i=%d close=%.8f cash=%.2f qty=%.8f equity=%.2f",
+                    log_prefix,
+                    bar.ts,
+                    bar.symbol,
+                    i,
+                    bar.close,
+                    portfolio.cash,
+                    portfolio.qty,
+                    equity_now,
+                )
+
+            # 4) Invocar la estrategia en esta barra
+            strategy.on_bar(bar, portfolio)
 
     # Hooks de cierre de la estrategia, si existen
     on_finish = getattr(strategy, "on_finish", None)
@@ -110,18 +136,17 @@ def run_engine(
     on_end = getattr(strategy, "on_end", None)
     if callable(on_end):
         try:
-            on_end(len(equity_curve), last_bar, portfolio)
+            on_end(n_bars, last_bar, portfolio)
         except Exception:
             logger.exception("%sError en strategy.on_end()", log_prefix)
             raise
 
-    # Guardar equity curve en portfolio y asegurar último punto coherente
-    portfolio._equity_curve = equity_curve  # expuesto intencionalmente
-
+    # Asegurar último punto coherente de la equity curve
     if last_bar is not None:
         final_equity = portfolio.equity()
-        if not equity_curve or equity_curve[-1][1] != final_equity:
-            equity_curve.append((last_bar.ts, final_equity))
+        if last_equity is None or last_equity != final_equity:
+            record_equity(last_bar.ts, final_equity)
+    portfolio.flush()
 
     # ------------------------------------------------------------------
     # Exportación automática de reports si hay reports_dir
@@ -129,7 +154,7 @@ def run_engine(
     reports_dir = getattr(portfolio, "reports_dir", None)
     if reports_dir is not None:
         try:
-            _export_equity_curve_csv(equity_curve, Path(reports_dir), log_prefix)
+            _export_equity_curve_csv(portfolio, Path(reports_dir), log_prefix)
         except Exception:
             logger.exception("%sFallo exportando equity_curve.csv", log_prefix)
         try:
@@ -140,22 +165,124 @@ def run_engine(
     return portfolio
 
 
+# ----------------------------------------------------------------------
+# Camino vectorizado
+# ----------------------------------------------------------------------
+
+
+def _run_vectorized(
+    bars: Iterable[Bar],
+    portfolio: Portfolio,
+    strategy: Any,
+    log_prefix: str,
+    log_every: int = 10,
+) -> tuple[int, Bar | None, float | None]:
+    """
+    Ejecuta una estrategia con `MODE = "vectorized"` sin llamar a `on_bar` por barra.
+
+    - Los cierres se materializan una vez en un array y la estrategia devuelve sus
+      señales con `vectorized_signals(closes, ts) -> (buy_idx, sell_idx)`.
+    - Entre señales el estado (cash, qty) no cambia: la equity curve de cada tramo es
+      `cash + qty * closes[tramo]`, calculada de golpe y añadida en bloque
+      (`portfolio.record_equity_many`). Mismos valores que el bucle barra a barra.
+    - En cada barra con señal (en orden; BUY antes que SELL si coinciden) se marca a
+      mercado y la estrategia ejecuta la orden con `on_signal(bar, side, portfolio)`,
+      tras registrar el punto de equity de esa barra (como `on_bar`).
+    - El logging por barra (INFO en la primera y cada `log_every`, DEBUG en el resto) se
+      emite por tramos con el estado de cada uno (`_log_segment`), igual que en el bucle.
+    - Después `run_engine` llama a `on_finish` / `on_end` como en el modo por barra: el
+      cierre de posiciones debe llegar como señal (p. ej. SELL en la última barra) y
+      `on_finish` no debe repetirlo en modo vectorizado (ver `BuySecondBarStrategy`).
+
+    Devuelve `(n_bars, last_bar, last_equity)` para los hooks y el chequeo final.
+    """
+    bars = list(bars)
+    n_bars = len(bars)
+    if not n_bars:
+        return 0, None, None
+    closes = np.fromiter((b.close for b in bars), dtype=np.float64, count=n_bars)
+    ts = np.empty(n_bars, dtype=object)
+    ts[:] = [b.ts for b in bars]
+
+    buy_idx, sell_idx = strategy.vectorized_signals(closes, ts)
+    signals = sorted([(int(i), "BUY") for i in buy_idx] + [(int(i), "SELL") for i in sell_idx])
+    logger.info("%s%d barras, %d señales (modo vectorizado)", log_prefix, n_bars, len(signals))
+
+    start = 0
+    last_equity: float | None = None
+    for i, side in [*signals, (n_bars - 1, None)]:
+        if i >= start:  # tramo [start, i] con el estado actual
+            equity = portfolio.cash + portfolio.qty * closes[start : i + 1]
+            portfolio.record_equity_many(ts[start : i + 1], equity)
+            _log_segment(bars, start, equity, portfolio, log_prefix, log_every)
+            last_equity = float(equity[-1])
+            start = i + 1
+        portfolio.mark_to_market(bars[i].close)
+        if side is not None:
+            strategy.on_signal(bars[i], side, portfolio)
+
+    return n_bars, bars[-1], last_equity
+
+
+def _log_segment(
+    bars: list[Bar],
+    start: int,
+    equity: np.ndarray,
+    portfolio: Portfolio,
+    log_prefix: str,
+    log_every: int,
+) -> None:
+    """
+    Logging por barra de un tramo `[start, start + len(equity))` del camino vectorizado,
+    con el mismo formato y niveles que el bucle de `run_engine` (cash y qty son los del
+    tramo, antes de la señal que lo cierra). Solo recorre el tramo si DEBUG está activo;
+    si no, salta directamente a los puntos de control INFO.
+    """
+    stop = start + len(equity)
+    step = log_every if log_every and log_every > 0 else 0
+    rows: Iterable[int]
+    if logger.isEnabledFor(logging.DEBUG):
+        rows = range(start, stop)
+    elif logger.isEnabledFor(logging.INFO):
+        # Puntos de control (i 1-based): la primera barra y los múltiplos de log_every
+        cps = range(-(-(start + 1) // step) * step - 1, stop, step) if step else range(0)
+        rows = [0, *cps] if start == 0 and 0 not in cps else cps
+    else:
+        return
+    for j in rows:
+        n = j + 1
+        checkpoint = n == 1 or (step and n % step == 0)
+        bar = bars[j]
+        logger.log(
+            logging.INFO if checkpoint else logging.DEBUG,
+            "%s[%s] %s i=%d close=%.8f cash=%.2f qty=%.8f equity=%.2f",
+            log_prefix,
+            bar.ts,
+            bar.symbol,
+            n,
+            bar.close,
+            portfolio.cash,
+            portfolio.qty,
+            float(equity[j - start]),
+        )
+
+
 # ----------------------------------------------------------------------
 # Helpers de exportación
 # ----------------------------------------------------------------------
 
 
 def _export_equity_curve_csv(
-    equity_curve: list[tuple[Any, float]],
+    portfolio: Portfolio,
     reports_dir: Path,
     log_prefix: str,
 ) -> None:
-    """Escribe equity_curve.csv a partir de la lista local."""
+    """Escribe equity_curve.csv a partir de la curva registrada en el Portfolio."""
     reports_dir.mkdir(parents=True, exist_ok=True)
-    if not equity_curve:
+    df = portfolio.equity_curve_dataframe()
+    if df.empty:
         logger.info("%sEquity curve vacía; no se escribe CSV", log_prefix)
         return
-    df = pd.DataFrame(equity_curve, columns=["ts", "equity"])
     path_equity = reports_dir / "equity_curve.csv"
     df.to_csv(path_equity, index=False)
     logger.info("%sEquity curve escrita en %s", log_prefix, path_equity)
@@ -181,6 +308,12 @@ def _export_trades_csv_if_any(
                 log_prefix,
                 path,
             )
+            # Copia columnar y tipada (ts, floats, categóricas) para lectores que no
+            # quieren re-parsear el CSV (p. ej. tests/test_trades_schema.py)
+            export_trades = getattr(portfolio, "export_trades", None)
+            if PARQUET_AVAILABLE and callable(export_trades):
+                path_pq = export_trades(reports_dir / "trades.parquet", fmt="parquet")
+                logger.info("%sTrades escritos (Parquet) en %s", log_prefix, path_pq)
         else:
             logger.info("%sNo hay trades (trades_dataframe vacío)", log_prefix)
         return
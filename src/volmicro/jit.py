@@ -0,0 +1,58 @@
+# src/volmicro/jit.py
+"""
+Compatibilidad opcional con Numba.
+
+Numba no es una dependencia obligatoria (extra `jit` en pyproject.toml). Este módulo
+expone un decorador `njit` que:
+
+- Si Numba está instalado, delega en `numba.njit` (compilación nativa).
+- Si no, devuelve la función Python tal cual (mismo código, sin compilar).
+
+Así los kernels numéricos se escriben una sola vez y los módulos que los usan pueden
+consultar `NUMBA_AVAILABLE` para decidir si el camino compilado compensa frente a su
+implementación Python de referencia.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any, TypeVar, overload
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+try:
+    import numba
+
+    _numba_njit: Callable[..., Any] | None = numba.njit
+except Exception:  # pragma: no cover
+    _numba_njit = None
+
+NUMBA_AVAILABLE = _numba_njit is not None
+
+
+@overload
+def njit(fn: F, /) -> F: ...
+
+
+@overload
+def njit(*args: Any, **kwargs: Any) -> Callable[[F], F]: ...
+
+
+def njit(*args: Any, **kwargs: Any) -> Any:
+    """
+    Equivalente a `numba.njit` admitiendo ambas formas: `@njit` y `@njit(cache=True, ...)`.
+    Sin Numba actúa como identidad.
+
+    Para el tipado la función decorada conserva su firma (las sobrecargas devuelven `F`),
+    así los llamadores ven los tipos de retorno del kernel y no `Any`.
+    """
+    if _numba_njit is not None:
+        return _numba_njit(*args, **kwargs)
+
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return args[0]
+
+    def _identity(fn: F) -> F:
+        return fn
+
+    return _identity
@@ -22,18 +22,36 @@ Flujo general (usado desde __main__.py):
 """
 
 import json
+import math
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
 from . import settings
+from .jit import NUMBA_AVAILABLE, njit
 
 # === Posibles nombres de columna temporal ===
 # Permitimos varios nombres para ser tolerantes con exportaciones distintas.
 TIME_CANDIDATES = ["timestamp", "ts", "time", "datetime", "openTime", "date"]
 
 
+# --------------------------------------------------------------------------------------
+# Helpers de rutas
+# --------------------------------------------------------------------------------------
+def _as_path(p: str | Path | None, default: Path) -> Path:
+    """
+    Normaliza una ruta opcional a `Path` sin reenvolver objetos que ya lo son.
+
+    - None      -> `default`
+    - Path      -> se devuelve tal cual (sin nueva asignación)
+    - str       -> Path(str)
+    """
+    if p is None:
+        return default
+    return p if isinstance(p, Path) else Path(p)
+
+
 # --------------------------------------------------------------------------------------
 # Lectura y normalización de equity_curve.csv
 # --------------------------------------------------------------------------------------
@@ -119,6 +137,50 @@ def _returns_from_equity(df: pd.DataFrame, use_daily: bool) -> tuple[pd.Series,
     return per_bar, "per-bar"
 
 
+# --------------------------------------------------------------------------------------
+# Max drawdown en una sola pasada
+# --------------------------------------------------------------------------------------
+@njit(cache=True)
+def _max_drawdown_kernel(equity: np.ndarray) -> float:
+    """
+    Mínimo de (equity / pico acumulado - 1) en un único bucle: pico, ratio y mínimo
+    fusionados, sin arrays intermedios. Ignora NaN como `cummax`/`min` de pandas.
+
+    Con pico 0.0 reproduce la división float de pandas en vez de lanzar
+    ZeroDivisionError: 0/0 = NaN (se ignora) y x/0 = ±inf según los signos.
+    """
+    peak = np.nan
+    worst = np.nan
+    for x in equity:
+        if np.isnan(x):
+            continue
+        if np.isnan(peak) or x > peak:
+            peak = x
+        if peak == 0.0:
+            if x == 0.0:
+                continue
+            dd = math.copysign(math.inf, x) * math.copysign(1.0, peak)
+        else:
+            dd = x / peak - 1.0
+        if not np.isnan(dd) and (np.isnan(worst) or dd < worst):
+            worst = dd
+    return worst
+
+
+def _max_drawdown(equity: np.ndarray) -> float:
+    """
+    Max drawdown de la curva de equity. Con Numba, kernel fusionado de una pasada; sin
+    él, NumPy vectorizado (`np.fmax.accumulate` = cummax que salta NaN).
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    if NUMBA_AVAILABLE:
+        return float(_max_drawdown_kernel(equity))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = equity / np.fmax.accumulate(equity) - 1.0
+    drawdown = drawdown[~np.isnan(drawdown)]
+    return float(drawdown.min()) if drawdown.size else np.nan
+
+
 # --------------------------------------------------------------------------------------
 # API principal: cálculo de métricas y guardado de summary.json
 # --------------------------------------------------------------------------------------
@@ -143,15 +205,11 @@ def calculate_metrics(
       - dict con métricas clave (total_return, annualized_return, volatility, sharpe, mdd, etc.)
     """
     # === 0) Rutas por defecto basadas en settings ===
-    reports_dir = Path(output_dir) if output_dir is not None else settings.REPORTS_DIR
+    reports_dir = _as_path(output_dir, settings.REPORTS_DIR)
     reports_dir.mkdir(parents=True, exist_ok=True)
 
-    equity_path = (
-        Path(equity_curve_path)
-        if equity_curve_path is not None
-        else (reports_dir / "equity_curve.csv")
-    )
-    trades_file = Path(trades_path) if trades_path is not None else (reports_dir / "trades.csv")
+    equity_path = _as_path(equity_curve_path, reports_dir / "equity_curve.csv")
+    trades_file = _as_path(trades_path, reports_dir / "trades.csv")
     summary_path = reports_dir / "summary.json"
 
     if not equity_path.exists():
@@ -180,9 +238,15 @@ def calculate_metrics(
 
     ann_days = int(getattr(settings, "METRICS_ANNUALIZATION_DAYS", 365))
 
-    # Media y desviación estándar de retornos en la base elegida
-    ret_std = float(ret.std()) if len(ret) > 0 else np.nan
-    ret_mean = float(ret.mean()) if len(ret) > 0 else np.nan
+    # Media y desviación estándar de retornos en la base elegida (dos reducciones de pandas;
+    # `len(ret)` se comprueba una sola vez)
+    has_ret = len(ret) > 0
+    ret_std = float(ret.std()) if has_ret else np.nan
+    ret_mean = float(ret.mean()) if has_ret else np.nan
+
+    # Factor de anualización escalar: se calcula una vez y se reutiliza (math.sqrt sobre float
+    # evita el coste de despachar un ufunc de NumPy para un único valor).
+    sqrt_ann = math.sqrt(ann_days)
 
     # Annualized return: elevamos de forma simple por días (no compuesta por número de barras)
     # Nota: esto asume que el periodo en días es la unidad de anualización a usar como exponente.
@@ -191,19 +255,17 @@ def calculate_metrics(
     )
 
     # Volatilidad anualizada: std(ret) * sqrt(ann_days)
-    annualized_volatility = ret_std * np.sqrt(ann_days) if np.isfinite(ret_std) else np.nan
+    annualized_volatility = ret_std * sqrt_ann if np.isfinite(ret_std) else np.nan
 
     # Sharpe (sin tasa libre de riesgo): mean/std * sqrt(ann_days)
     sharpe_ratio = (
-        (ret_mean / ret_std) * np.sqrt(ann_days)
+        (ret_mean / ret_std) * sqrt_ann
         if (np.isfinite(ret_mean) and ret_std and ret_std > 0)
         else np.nan
     )
 
-    # Max Drawdown: mínimo de (equity / peak - 1)
-    rolling_max = df["equity"].cummax()
-    drawdown = (df["equity"] / rolling_max) - 1.0
-    max_drawdown = float(drawdown.min()) if not drawdown.empty else np.nan
+    # Max Drawdown: mínimo de (equity / peak - 1), en una pasada sobre el array
+    max_drawdown = _max_drawdown(df["equity"].to_numpy())
 
     # === 4) Lectura de trades para KPIs complementarios (opcional) ===
     trades_df = pd.read_csv(trades_file)
@@ -22,10 +22,13 @@ Diseño
 - La simulación de ejecución está separada en `_apply_execution_model(...)` que devuelve
   un `ExecPreview` (vista previa) con precio/cantidad tras slippage+redondeos y checks.
 - Las reglas del exchange se modelan con `SymbolRules` y se aplican vía
-  `apply_exchange_rules(...)` (en `src/volmicro/rules.py`).
-- Los trades se almacenan como dataclasses `Trade` y además guardamos metadatos paralelos
-  (slippage aplicado, redondeos, reglas usadas, run_id, fee_bps, etc.) para cumplir un
-  **esquema** estable (ver `tests/test_trades_schema.py` y `SCHEMA_VERSION`).
+  `apply_exchange_rules_f64(...)` (en `src/volmicro/rules.py`), en float64 sin `Decimal`.
+- Los trades se almacenan en un **buffer columnar** (Struct-of-Arrays): un array NumPy
+  preasignado por columna (campos de `Trade` + metadatos de ejecución: slippage aplicado,
+  redondeos, reglas usadas, run_id, fee_bps, etc.), que crece por duplicación como un
+  vector de C++. Así se cumple un **esquema** estable (ver `tests/test_trades_schema.py` y
+  `SCHEMA_VERSION`) sin crear un dict por trade, y `trades_dataframe()` se construye con
+  cortes de arrays en lugar de recorrer objetos fila a fila.
 
 Integración
 -----------
@@ -39,28 +42,170 @@ Integración
 from __future__ import annotations
 
 import logging
+import math
+from collections.abc import Mapping
 from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
 from typing import Any, Literal
 
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover
+    pa = None
+    pq = None
+
 from src.volmicro.const import SCHEMA_VERSION  # versión del esquema de salida (CSV de trades)
-from src.volmicro.rules import SymbolRules, apply_exchange_rules
+from src.volmicro.rules import (
+    SymbolRules,
+    apply_exchange_rules_batch,
+    apply_exchange_rules_f64,
+    apply_exchange_rules_nb,
+)
 
 from . import settings
+from .jit import NUMBA_AVAILABLE, njit
 from .trades import Trade
 
 logger = logging.getLogger(__name__)
 
+# True si se puede exportar a Parquet (pyarrow instalado, extra `parquet`).
+PARQUET_AVAILABLE = pa is not None
+
+# x * y + z con un único redondeo (math.fma existe desde Python 3.13).
+if hasattr(math, "fma"):
+    _fma = math.fma
+else:
+
+    def _fma(x: float, y: float, z: float) -> float:
+        return x * y + z
+
+
+# pandas >= 3 siempre usa Copy-on-Write; en 2.x es opcional (`mode.copy_on_write`).
+_PANDAS_ALWAYS_COW = int(pd.__version__.split(".", 1)[0]) >= 3
+
+
+def _copy_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Copia de `df` que se puede modificar sin tocar el original: superficial con
+    Copy-on-Write (O(columnas)), profunda en pandas 2.x sin él.
+    """
+    if _PANDAS_ALWAYS_COW or pd.get_option("mode.copy_on_write") is True:
+        return df.copy(deep=False)
+    return df.copy()
+
+
+def _require_pyarrow() -> None:
+    """Falla con un mensaje claro si se pide Parquet sin pyarrow instalado."""
+    if pa is None:
+        raise RuntimeError(
+            "pyarrow no está instalado. Ejecuta: pip install 'volmicro[parquet]' "
+            "o exporta con fmt='csv'"
+        )
+
+
+# --------------------------------------------------------------------------------------
+# Esquema columnar de trades (orden = orden de columnas en trades_dataframe / trades.csv)
+# --------------------------------------------------------------------------------------
+# Columnas base: coinciden con los campos del dataclass `Trade`.
+# `symbol`, `side` y `rule_check` se guardan como códigos enteros (ver más abajo) y se
+# expanden a `pd.Categorical` en `trades_dataframe()`: sin un str por fila en el buffer.
+_BASE_COLS: dict[str, Any] = {
+    "ts": object,
+    "symbol": np.int32,
+    "side": np.int8,
+    "qty": np.float64,
+    "price": np.float64,
+    "fee": np.float64,
+    "cash_after": np.float64,
+    "qty_after": np.float64,
+    "equity_after": np.float64,
+    "realized_pnl": np.float64,
+    "cum_realized_pnl": np.float64,
+    "note": object,
+}
+
+# Metadatos de ejecución (slippage, redondeos, reglas, trazabilidad).
+_META_COLS: dict[str, Any] = {
+    "intended_price": np.float64,
+    "exec_price_raw": np.float64,
+    "price_round_diff": np.float64,
+    "qty_raw": np.float64,
+    "qty_rounded": np.float64,
+    "qty_round_diff": np.float64,
+    "slippage_bps": np.float64,
+    "notional_before_round": np.float64,
+    "notional_after_round": np.float64,
+    "rule_check": np.int8,
+    "run_id": object,
+    "fee_bps": np.float64,
+    "schema_version": np.int64,
+    "tickSize_used": object,
+    "stepSize_used": object,
+    "minNotional_used": object,
+}
+
+_TRADE_COLS: dict[str, Any] = {**_BASE_COLS, **_META_COLS}
+
+# Columnas float64 de `Trade`, en el orden de sus campos (entre `side` y `note`).
+_TRADE_FLOAT_FIELDS: tuple[str, ...] = Trade._fields[3:-1]
+
+# Categorías de las columnas codificadas (código = índice en la tupla).
+_SIDES: tuple[str, ...] = ("BUY", "SELL")
+_SIDE_BUY, _SIDE_SELL = 0, 1
+
+# Valores de las columnas de metadatos cuando un trade se registra sin ellos. `rule_check`
+# usa el código -1 (sin categoría: NaN en `Categorical.from_codes`, nulo en Arrow) para no
+# confundirse con 0 = "OK"; `schema_version` 0 no es una versión válida (desconocida).
+_META_DEFAULTS: dict[str, Any] = {
+    name: None if dtype is object else (0 if np.dtype(dtype).kind == "i" else np.nan)
+    for name, dtype in _META_COLS.items()
+}
+_META_DEFAULTS["rule_check"] = -1
+
+# Capacidad inicial del buffer de trades (se duplica al llenarse).
+_INITIAL_TRADE_CAP = 1024
+
+# Registro empaquetado de un trade (campos base) para `Portfolio.trades_array()`: `ts`,
+# `side` y los campos float64 que se copian tal cual del buffer (`_TRADE_RECORD_FLOATS`).
+_TRADE_RECORD_FLOATS: tuple[str, ...] = (
+    "qty",
+    "price",
+    "fee",
+    "cash_after",
+    "qty_after",
+    "equity_after",
+    "realized_pnl",
+    "cum_realized_pnl",
+)
+_TRADE_RECORD_DTYPE = np.dtype(
+    [("ts", "datetime64[ns]"), ("side", "U4")] + [(name, "f8") for name in _TRADE_RECORD_FLOATS]
+)
+
+# Plantilla vacía (solo cabecera) para equity_curve_dataframe sin datos; se construye
+# una vez y se devuelven copias.
+_EMPTY_EQUITY_DF = pd.DataFrame(columns=["ts", "equity"])
+
+# Tamaño de cada bloque de la curva de equity (una fila por barra).
+_EQUITY_CHUNK = 4096
+
 
 # --------------------------------------------------------------------------------------
 # Estructura de vista previa de ejecución (resultado de aplicar slippage + reglas)
 # --------------------------------------------------------------------------------------
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ExecPreview:
     """
     Resultado intermedio de la simulación de ejecución ANTES de tocar el estado de la cartera.
 
+    Lo construye `_apply_execution_model` (vista previa bajo demanda; `buy`/`sell` usan
+    directamente la tupla de `_exec_math`). Inmutable (`frozen`) y con `slots=True`: sin
+    `__dict__` por instancia; se guarda tal cual en `Portfolio.previews`.
+
     Campos principales:
     - valid:   Si la orden supera los checks (cash, minNotional, minQty, etc.).
     - reason:  Texto explicativo si no es válida.
@@ -90,6 +235,188 @@ class ExecPreview:
     notional_after_round: float
 
 
+@dataclass(slots=True)
+class ExecPreviewBatch:
+    """
+    Versión columnar (Struct-of-Arrays) de `ExecPreview` para N órdenes a la vez.
+
+    Cada campo es un array de longitud N alineado con las órdenes de entrada, salvo
+    `slippage_bps` (escalar, común a todo el lote). Los motivos se guardan como códigos
+    (`reason_code`, índice en `_EXEC_REASONS`); `preview(i)` reconstruye el `ExecPreview`
+    de una orden concreta para el llamador que itera sobre el lote.
+    """
+
+    valid: np.ndarray
+    reason_code: np.ndarray
+    intended_price: np.ndarray
+    exec_price_raw: np.ndarray
+    exec_price: np.ndarray
+    qty_raw: np.ndarray
+    qty_rounded: np.ndarray
+    price_round_diff: np.ndarray
+    qty_round_diff: np.ndarray
+    slippage_bps: float
+    notional_before_round: np.ndarray
+    notional_after_round: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def preview(self, i: int) -> ExecPreview:
+        """`ExecPreview` escalar de la orden `i` del lote."""
+        return ExecPreview(
+            valid=bool(self.valid[i]),
+            reason=_EXEC_REASONS[int(self.reason_code[i])],
+            intended_price=float(self.intended_price[i]),
+            exec_price_raw=float(self.exec_price_raw[i]),
+            exec_price=float(self.exec_price[i]),
+            qty_raw=float(self.qty_raw[i]),
+            qty_rounded=float(self.qty_rounded[i]),
+            price_round_diff=float(self.price_round_diff[i]),
+            qty_round_diff=float(self.qty_round_diff[i]),
+            slippage_bps=self.slippage_bps,
+            notional_before_round=float(self.notional_before_round[i]),
+            notional_after_round=float(self.notional_after_round[i]),
+        )
+
+
+# --------------------------------------------------------------------------------------
+# Kernel numérico del modelo de ejecución (compilado con Numba si está disponible)
+# --------------------------------------------------------------------------------------
+# Motivos de rechazo por código (0 = OK); el kernel devuelve el código, no el texto.
+_EXEC_REASONS: tuple[str | None, ...] = (
+    None,
+    "qty_rounded == 0 tras stepSize",
+    "cash insuficiente (notional + fee)",
+    "reglas exchange: minNotional/minQty",
+    "qty/ref_price no válidos",
+)
+
+# Etiquetas de `rule_check` por código: mismo índice que `_EXEC_REASONS`, con "OK" en 0.
+_RULE_CHECKS: tuple[str, ...] = tuple(r if r is not None else "OK" for r in _EXEC_REASONS)
+
+
+def _rule_units(rules: SymbolRules | None) -> tuple[float, float, float, float, float, float]:
+    """
+    Representación float de las reglas para el kernel (`SymbolRules.f64_units`):
+    (tick_k, tick_scale, step_k, step_scale, min_qty, min_notional).
+    Sin reglas se usan valores neutros.
+    """
+    if rules is None:
+        return 0.0, 1.0, 0.0, 1.0, 0.0, 0.0
+    return rules.f64_units
+
+
+@njit(cache=True)
+def _exec_model_kernel(
+    is_buy: bool,
+    ref_price: float,
+    qty_raw: float,
+    slip_up: float,
+    slip_dn: float,
+    fee_mult: float,
+    cash: float,
+    has_rules: bool,
+    tick_k: float,
+    tick_scale: float,
+    step_k: float,
+    step_scale: float,
+    min_qty: float,
+    min_notional: float,
+) -> tuple[int, float, float, float]:
+    """
+    Núcleo aritmético de `Portfolio._apply_execution_model` (slippage, redondeos y checks)
+    sobre floats planos. Devuelve `(reason_code, exec_price_raw, exec_price, qty_rounded)`,
+    con `reason_code` indexando `_EXEC_REASONS`.
+    """
+    exec_price_raw = ref_price * (slip_up if is_buy else slip_dn)
+    if has_rules:
+        exec_price, qty_rounded, ok = apply_exchange_rules_nb(
+            exec_price_raw, qty_raw, tick_k, tick_scale, step_k, step_scale, min_qty, min_notional
+        )
+    else:
+        exec_price = exec_price_raw
+        qty_rounded = qty_raw
+        ok = True
+
+    if qty_rounded <= 0.0:
+        code = 1
+    elif is_buy and exec_price * qty_rounded * fee_mult > cash + 1e-9:
+        code = 2
+    elif not ok:
+        code = 3
+    else:
+        code = 0
+    return code, exec_price_raw, exec_price, qty_rounded
+
+
+@njit(cache=True)
+def _avg_cost_kernel(
+    is_buy: np.ndarray,
+    qty: np.ndarray,
+    price: np.ndarray,
+    fee: np.ndarray,
+    net_fees: bool,
+) -> tuple[np.ndarray, np.ndarray, float]:
+    """
+    PnL realizado por coste medio sobre una secuencia de trades (misma lógica que
+    `buy`/`sell`). Es el único paso dependiente de la trayectoria en
+    `Portfolio.simulate_vectorized`, y recorre solo los trades, no todas las barras.
+    Devuelve `(realized, cum_realized, avg_price_final)`.
+    """
+    n = len(qty)
+    realized = np.zeros(n)
+    cum = np.zeros(n)
+    pos = 0.0
+    avg = 0.0
+    total = 0.0
+    for i in range(n):
+        if is_buy[i]:
+            new_pos = pos + qty[i]
+            avg = price[i] if pos <= 0.0 else (avg * pos + price[i] * qty[i]) / new_pos
+            pos = new_pos
+        else:
+            r = (price[i] - avg) * qty[i]
+            if net_fees:
+                r -= fee[i]
+            realized[i] = r
+            total += r
+            pos -= qty[i]
+            if pos <= 1e-12:
+                pos = 0.0
+                avg = 0.0
+        cum[i] = total
+    return realized, cum, avg
+
+
+# --------------------------------------------------------------------------------------
+# Snapshot de reglas: nombres aceptados por campo (SymbolRules u objetos/dicts similares)
+# --------------------------------------------------------------------------------------
+_TICK_NAMES: tuple[str, ...] = ("tick_size", "tickSize", "tick_size_step")
+_STEP_NAMES: tuple[str, ...] = ("step_size", "stepSize", "step_size_step")
+_MIN_NOTIONAL_NAMES: tuple[str, ...] = (
+    "min_notional",
+    "minNotional",
+    "notionalMin",
+    "min_notional_value",
+)
+
+
+def _get_any(obj: Any, names: tuple[str, ...]) -> Any:
+    """
+    Primer valor presente en `obj` entre `names` (atributo o clave de dict), o None.
+    Estilo EAFP: un solo `getattr` por nombre en lugar de `hasattr` + `getattr`.
+    """
+    is_dict = isinstance(obj, dict)
+    for name in names:
+        try:
+            return getattr(obj, name)
+        except AttributeError:
+            if is_dict and name in obj:
+                return obj[name]
+    return None
+
+
 # --------------------------------------------------------------------------------------
 # Cartera: estado, ejecución simulada, reporting
 # --------------------------------------------------------------------------------------
@@ -117,6 +444,14 @@ class Portfolio:
         Slippage en bps aplicado al precio de referencia (BUY sube, SELL baja).
     run_id : Optional[str]
         Identificador único de la ejecución (se propaga a metadatos de trades).
+    record_meta : bool
+        Si False, no se registran los metadatos de ejecución de cada trade (las columnas
+        de metadatos quedan a NaN/None en `trades_dataframe()`). Default:
+        `settings.TRADES_RECORD_META`.
+    record_previews : bool
+        Si True, cada orden intentada (ejecutada o no) deja su `ExecPreview` en
+        `previews`, para depurar el modelo de ejecución. Default False: `buy`/`sell`
+        trabajan sobre tuplas y no construyen ningún `ExecPreview`.
 
     Atributos derivados
     -------------------
@@ -125,11 +460,41 @@ class Portfolio:
     last_price : Optional[float]
         Último precio marcado por mark_to_market; si None, equity = cash.
     trades : List[Trade]
-        Lista de operaciones ejecutadas (BUY/SELL).
-    _trade_meta : List[Dict[str, Any]]
-        Metadatos paralelos (slippage/rounding/reglas/etc.) alineados con `trades`.
-    _equity_curve : List[Tuple[pd.Timestamp, float]]
-        Muestras de la curva de equity registradas por el `engine`.
+        Operaciones ejecutadas (BUY/SELL); propiedad que las reconstruye desde el buffer.
+    previews : List[ExecPreview]
+        Vistas previas de las órdenes intentadas (solo con `record_previews=True`).
+    _columns : Dict[str, np.ndarray]
+        Buffer columnar de trades (campos de `Trade` + metadatos), un array por columna.
+    _n / _cap : int
+        Filas ocupadas / capacidad actual del buffer columnar.
+    _ts_sorted : bool
+        True mientras los trades se hayan registrado en orden de `ts` (evita ordenar).
+    _symbols / _symbol_ids : List[str] / Dict[str, int]
+        Tabla de símbolos de la columna `symbol` (código int32 <-> texto).
+    _fee_rate / _fee_mult : float
+        fee_bps / 1e4 y 1 + fee_bps / 1e4, precalculados (ver `_refresh_exec_constants`).
+    _slip / _slip_up / _slip_dn : float
+        slippage_bps / 1e4 y sus factores BUY (1 + slip) / SELL (1 - slip).
+    _rules_snapshot_cached : Mapping[str, Any]
+        Snapshot (solo lectura) de tick/step/minNotional de `rules`; se recalcula en
+        `set_execution_rules`, no en cada trade.
+    _meta_template : Dict[str, Any]
+        Metadatos constantes por run (snapshot de reglas, run_id, slippage_bps,
+        schema_version, rule_check). `_record` no los copia por fila: ver `_meta_runs`.
+    _meta_runs / _meta_synced : List[Tuple[int, Optional[Mapping]]] / int
+        Tramos de filas consecutivas que comparten plantilla de metadatos constantes
+        (`(fila_inicial, plantilla)`; None = filas ya escritas completas) y filas hasta las
+        que esas columnas están rellenas. `_sync_run_meta` las rellena por tramos al leer.
+    _rule_units : Tuple[float, ...]
+        tick/step/minQty/minNotional como floats planos para `_exec_model_kernel`.
+    _fast_path : bool
+        Sin reglas, slippage ni fees (y PnL bruto): el modelo de ejecución es la
+        identidad y `buy`/`sell` se saltan `_exec_math`.
+    _eq_buf_ts / _eq_buf_val : np.ndarray
+        Bloque activo de la curva de equity (`_EQUITY_CHUNK` filas, `_eq_buf_i` ocupadas)
+        donde escribe `record_equity` (timestamps tal cual llegan en `Bar.ts` + equity en
+        float64). Los bloques llenos pasan sin copia a `_eq_chunks`; `flush()` los
+        consolida en un único par de arrays.
     avg_price : float
         Precio medio de la posición actual (si qty>0).
     realized_pnl : float
@@ -145,9 +510,6 @@ class Portfolio:
     # --- Estado derivado / tracking ---
     starting_cash: float = field(init=False)
     last_price: float | None = None
-    trades: list[Trade] = field(default_factory=list)
-    _trade_meta: list[dict[str, Any]] = field(default_factory=list)
-    _equity_curve: list[tuple[pd.Timestamp, float]] | None = None
 
     # --- Posición y PnL ---
     avg_price: float = 0.0
@@ -162,12 +524,67 @@ class Portfolio:
     run_id: str | None = None
     reports_dir: str | None = None
 
+    # --- Registro de metadatos por trade ---
+    record_meta: bool = field(default_factory=lambda: bool(settings.TRADES_RECORD_META))
+    record_previews: bool = False
+    previews: list[ExecPreview] = field(default_factory=list, init=False, repr=False)
+
     # ----------------------------------------------------------------------------------
     # Ciclo de vida
     # ----------------------------------------------------------------------------------
     def __post_init__(self) -> None:
-        """Guarda el cash inicial para calcular PnL total a futuro."""
+        """Guarda el cash inicial y preasigna el buffer columnar de trades."""
         self.starting_cash = float(self.cash)
+        self._starting_qty = float(self.qty)
+        self._cap = _INITIAL_TRADE_CAP
+        self._n = 0
+        self._ts_sorted = True
+        self._columns: dict[str, np.ndarray] = {
+            name: np.empty(self._cap, dtype=dtype) for name, dtype in _TRADE_COLS.items()
+        }
+        self._symbols: list[str] = []
+        self._symbol_ids: dict[str, int] = {}
+        self._trades_df_cache: tuple[int, pd.DataFrame] | None = None
+        self._meta_runs: list[tuple[int, Mapping[str, Any] | None]] = [(0, None)]
+        self._meta_synced = 0
+        self._rules_snapshot_cached: Mapping[str, Any] = MappingProxyType(self._rules_snapshot())
+        self._refresh_exec_constants()
+        self._eq_chunks: list[tuple[np.ndarray, np.ndarray]] = []
+        self._eq_buf_ts: np.ndarray
+        self._eq_buf_val: np.ndarray
+        self._eq_buf_i: int
+        self._new_equity_chunk()
+
+    def _refresh_exec_constants(self) -> None:
+        """
+        Precalcula los factores de comisión y slippage usados en cada orden.
+
+        `fee_bps` y `slippage_bps` solo cambian en la construcción o vía
+        `set_execution_rules`, así que la división por 10_000 se hace aquí una vez y el
+        camino de ejecución solo multiplica. También arma `_meta_template` (run_id,
+        slippage, schema_version y snapshot de reglas). Si se modifican esos atributos a
+        mano, hay que volver a llamar a este método.
+        """
+        self._fee_rate = self.fee_bps / 10_000.0
+        self._fee_mult = 1.0 + self._fee_rate
+        self._slip = self.slippage_bps / 10_000.0
+        self._slip_up = 1 + self._slip
+        self._slip_dn = 1 - self._slip
+        self._rule_units = _rule_units(self.rules)
+        self._fast_path = (
+            self.rules is None
+            and self.slippage_bps == 0
+            and self.fee_bps == 0
+            and not self.realized_pnl_net_fees
+        )
+        # Claves de metadatos que no cambian entre trades del run
+        self._meta_template: dict[str, Any] = {
+            "slippage_bps": self.slippage_bps,
+            "rule_check": 0,  # "OK": solo se registran ejecuciones válidas
+            "run_id": self.run_id,
+            "schema_version": SCHEMA_VERSION,
+            **self._rules_snapshot_cached,
+        }
 
     # ----------------------------------------------------------------------------------
     # API de reglas y slippage
@@ -176,9 +593,14 @@ class Portfolio:
         """
         Inyecta reglas del exchange y el slippage del modelo de ejecución.
         Debe llamarse desde __main__.py antes del backtest.
+
+        Las reglas son inmutables durante el run, así que aquí se congela su snapshot
+        (tick/step/minNotional) para reutilizarlo en los metadatos de cada trade.
         """
         self.rules = rules
         self.slippage_bps = float(slippage_bps)
+        self._rules_snapshot_cached = MappingProxyType(self._rules_snapshot())
+        self._refresh_exec_constants()
 
     # ----------------------------------------------------------------------------------
     # Helpers de estado
@@ -201,19 +623,207 @@ class Portfolio:
         """
         self.last_price = float(price)
 
-    def _record(self, tr: Trade, meta: dict[str, Any] | None = None) -> None:
+    def _reserve(self, extra: int) -> None:
+        """
+        Garantiza hueco para `extra` filas más en el buffer columnar. La capacidad se
+        duplica las veces necesarias pero las filas ya ocupadas se copian una sola vez,
+        también cuando llega una ráfaga de trades de golpe (`_record_many`).
         """
-        Registra un trade y sus metadatos (alineados por índice).
+        new_cap = self._cap
+        while new_cap < self._n + extra:
+            new_cap *= 2
+        if new_cap == self._cap:
+            return
+        for name, arr in self._columns.items():
+            grown = np.empty(new_cap, dtype=arr.dtype)
+            grown[: self._n] = arr[: self._n]
+            self._columns[name] = grown
+        self._cap = new_cap
+
+    def record_equity(self, ts: Any, equity: float) -> None:
         """
-        self.trades.append(tr)
-        self._trade_meta.append(meta or {})
+        Añade un punto (ts, equity) a la curva. Lo llama el `engine` una vez por barra.
 
-    def _fee_from_notional(self, notional: float) -> float:
+        `ts` se guarda tal cual (referencia al `Bar.ts`, sin convertir por barra); la
+        conversión a datetime se hace una sola vez, vectorizada, en
+        `equity_curve_dataframe()`. Al llenarse el bloque activo se aparca entero en
+        `_eq_chunks` y se abre otro: nunca se copian las filas ya escritas.
+        """
+        i = self._eq_buf_i
+        if i == _EQUITY_CHUNK:
+            self._eq_chunks.append((self._eq_buf_ts, self._eq_buf_val))
+            self._new_equity_chunk()
+            i = 0
+        self._eq_buf_ts[i] = ts
+        self._eq_buf_val[i] = equity
+        self._eq_buf_i = i + 1
+
+    def record_equity_many(self, ts: np.ndarray, equity: np.ndarray) -> None:
+        """
+        Añade un tramo de puntos (ts, equity) de golpe, en orden tras los ya registrados
+        (camino vectorizado del engine). El bloque activo se aparca y el tramo entra
+        como un bloque más de `_eq_chunks`, sin copiarlo fila a fila.
         """
-        Calcula la comisión explícita:
-          fee = notional * fee_bps / 10_000
+        i = self._eq_buf_i
+        if i:
+            self._eq_chunks.append((self._eq_buf_ts[:i], self._eq_buf_val[:i]))
+            self._new_equity_chunk()
+        self._eq_chunks.append((np.asarray(ts, dtype=object), np.asarray(equity, dtype=np.float64)))
+
+    def _new_equity_chunk(self) -> None:
+        """Abre un bloque vacío para `record_equity`."""
+        self._eq_buf_ts = np.empty(_EQUITY_CHUNK, dtype=object)
+        self._eq_buf_val = np.empty(_EQUITY_CHUNK, dtype=np.float64)
+        self._eq_buf_i = 0
+
+    def flush(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Consolida los bloques de la curva de equity en un único par `(ts, equity)` y lo
+        devuelve. Se llama al final del run (engine) y desde `equity_curve_dataframe()`;
+        es idempotente y se puede seguir registrando después.
+        """
+        i = self._eq_buf_i
+        if i or not self._eq_chunks:
+            self._eq_chunks.append((self._eq_buf_ts[:i], self._eq_buf_val[:i]))
+            self._new_equity_chunk()
+        if len(self._eq_chunks) > 1:
+            ts = np.concatenate([c[0] for c in self._eq_chunks])
+            val = np.concatenate([c[1] for c in self._eq_chunks])
+            self._eq_chunks = [(ts, val)]
+        return self._eq_chunks[0]
+
+    def _record(
+        self,
+        ts: Any,
+        side: int,
+        qty: float,
+        price: float,
+        fee: float,
+        equity_after: float,
+        realized_pnl: float,
+        note: str,
+        exec_info: tuple[float, float, float, float, float, float] | None = None,
+    ) -> None:
         """
-        return notional * (self.fee_bps / 10_000.0)
+        Escribe un trade y sus metadatos directamente en el buffer columnar (una fila,
+        una asignación escalar por columna), sin crear un `Trade` ni un dict intermedio.
+
+        `side` llega ya codificado (índice en `_SIDES`); cash/qty/PnL acumulado se leen
+        del estado actual (posterior a la ejecución). `exec_info` es el resultado del
+        modelo de ejecución `(ref_price, qty_raw, exec_price_raw, exec_price, qty_rounded,
+        fee_bps)`: de él salen los metadatos por trade. Los constantes del run
+        (`_meta_template`; sin `exec_info`, todos a sus valores vacíos `_META_DEFAULTS`) no
+        se escriben por fila: solo se abre un tramo en `_meta_runs` si la plantilla cambia,
+        y `_sync_run_meta` los difunde por tramos al leer el buffer.
+        """
+        if self._n == self._cap:
+            self._reserve(1)
+        i = self._n
+        cols = self._columns
+        if i and self._ts_sorted and ts < cols["ts"][i - 1]:
+            self._ts_sorted = False  # inserción fuera de orden: trades_dataframe ordenará
+        cols["ts"][i] = ts
+        cols["symbol"][i] = self._symbol_code(self.symbol)
+        cols["side"][i] = side
+        cols["qty"][i] = qty
+        cols["price"][i] = price
+        cols["fee"][i] = fee
+        cols["cash_after"][i] = self.cash
+        cols["qty_after"][i] = self.qty
+        cols["equity_after"][i] = equity_after
+        cols["realized_pnl"][i] = realized_pnl
+        cols["cum_realized_pnl"][i] = self.realized_pnl
+        cols["note"][i] = note
+        if exec_info is None:
+            tmpl: Mapping[str, Any] = _META_DEFAULTS
+        else:
+            ref_price, qty_raw, exec_price_raw, exec_price, qty_rounded, fee_bps = exec_info
+            cols["intended_price"][i] = ref_price
+            cols["exec_price_raw"][i] = exec_price_raw
+            cols["price_round_diff"][i] = exec_price_raw - exec_price
+            cols["qty_raw"][i] = qty_raw
+            cols["qty_rounded"][i] = qty_rounded
+            cols["qty_round_diff"][i] = qty_raw - qty_rounded
+            cols["notional_before_round"][i] = exec_price_raw * qty_raw
+            cols["notional_after_round"][i] = exec_price * qty_rounded
+            cols["fee_bps"][i] = fee_bps
+            tmpl = self._meta_template
+        if self._meta_runs[-1][1] is not tmpl:
+            self._meta_runs.append((i, tmpl))
+        self._n = i + 1
+
+    def _record_many(self, values: Mapping[str, Any], m: int) -> None:
+        """
+        Escribe `m` trades de golpe al final del buffer: una asignación por columna
+        (array de longitud `m` o escalar difundido) en lugar de `m` llamadas a `_record`.
+
+        `values` debe traer todas las columnas de `_TRADE_COLS` ya codificadas (side,
+        symbol, rule_check); se usa para ráfagas de fills generadas en bloque.
+        """
+        self._reserve(m)
+        i = self._n
+        cols = self._columns
+        for name, value in values.items():
+            cols[name][i : i + m] = value
+        if m and self._meta_runs[-1][1] is not None:
+            self._meta_runs.append((i, None))  # filas ya completas: nada que difundir
+        if m:
+            ts = pd.Index(cols["ts"][max(i - 1, 0) : i + m])
+            self._ts_sorted = self._ts_sorted and bool(ts.is_monotonic_increasing)
+        self._n = i + m
+
+    def _sync_run_meta(self) -> None:
+        """
+        Rellena las columnas de metadatos constantes de las filas pendientes: una
+        asignación por columna y tramo de `_meta_runs` (difusión de un escalar), no una por
+        trade. La llaman los lectores del buffer completo (`trades_dataframe`,
+        `export_trades`); es idempotente.
+        """
+        n = self._n
+        if self._meta_synced == n:
+            return
+        cols = self._columns
+        runs = self._meta_runs
+        ends = [start for start, _ in runs[1:]] + [n]
+        for (start, tmpl), end in zip(runs, ends, strict=True):
+            lo = max(start, self._meta_synced)
+            if tmpl is None or lo >= end:
+                continue
+            for name, value in tmpl.items():
+                cols[name][lo:end] = value
+        self._meta_synced = n
+        self._meta_runs = runs[-1:]  # el último tramo sigue abierto para nuevas filas
+
+    @property
+    def trades(self) -> list[Trade]:
+        """
+        Trades ejecutados como objetos `Trade`, en orden de ejecución.
+
+        Se materializan bajo demanda desde el buffer columnar (compatibilidad con código
+        que itera trades); para análisis es preferible `trades_dataframe()`. Se convierte
+        columna a columna (`tolist()`, decodificando side/symbol con una lista por código)
+        y las filas se arman con `Trade._make`, sin indexar los arrays elemento a elemento.
+        """
+        n = self._n
+        cols = self._columns
+        symbols = self._symbols
+        rows = zip(
+            cols["ts"][:n].tolist(),
+            [symbols[c] for c in cols["symbol"][:n].tolist()],
+            [_SIDES[c] for c in cols["side"][:n].tolist()],
+            *(cols[name][:n].tolist() for name in _TRADE_FLOAT_FIELDS),
+            cols["note"][:n].tolist(),
+            strict=True,
+        )
+        return list(map(Trade._make, rows))
+
+    def _symbol_code(self, symbol: str) -> int:
+        """Código int32 del símbolo en la tabla `_symbols` (lo añade si es nuevo)."""
+        code = self._symbol_ids.get(symbol)
+        if code is None:
+            code = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return code
 
     # ----------------------------------------------------------------------------------
     # Snapshot de reglas para logging/export (tick/step/minNotional usados)
@@ -227,27 +837,74 @@ class Portfolio:
         if r is None:
             return {"tickSize_used": None, "stepSize_used": None, "minNotional_used": None}
 
-        def get_any(obj: Any, names: list[str]):
-            for n in names:
-                if hasattr(obj, n):
-                    return getattr(obj, n)
-                if isinstance(obj, dict) and n in obj:
-                    return obj[n]
-            return None
-
-        tick = get_any(r, ["tick_size", "tickSize", "tick_size_step", "tick_size"])
-        step = get_any(r, ["step_size", "stepSize", "step_size_step", "step_size"])
-        minimo = get_any(r, ["min_notional", "minNotional", "notionalMin", "min_notional_value"])
-
         return {
-            "tickSize_used": tick,
-            "stepSize_used": step,
-            "minNotional_used": minimo,
+            "tickSize_used": _get_any(r, _TICK_NAMES),
+            "stepSize_used": _get_any(r, _STEP_NAMES),
+            "minNotional_used": _get_any(r, _MIN_NOTIONAL_NAMES),
         }
 
     # ----------------------------------------------------------------------------------
     # Núcleo de ejecución: modelo (slippage + redondeos + checks)
     # ----------------------------------------------------------------------------------
+    def _exec_math(
+        self, is_buy: bool, ref_price: float, qty_raw: float
+    ) -> tuple[int, float, float, float]:
+        """
+        Núcleo del **modelo de ejecución** sin mutar estado ni crear objetos:
+          1) Aplica slippage (bps) al precio de referencia.
+          2) Redondea precio (tickSize) y cantidad (stepSize) según reglas (si hay).
+          3) Valida qty>0 tras redondeo, cash (para BUY) y minQty/minNotional.
+
+        Devuelve `(reason_code, exec_price_raw, exec_price, qty_rounded)`, con
+        `reason_code` indexando `_EXEC_REASONS` (0 = válida). Es lo que usan `buy`/`sell`;
+        `_apply_execution_model` lo envuelve en un `ExecPreview` para quien lo pida.
+        """
+        # Validación básica
+        if qty_raw <= 0 or ref_price <= 0:
+            return 4, ref_price, ref_price, 0.0
+
+        # Sin reglas no hay redondeos ni mínimos: solo slippage y (en BUY) cash
+        rules = self.rules
+        if rules is None:
+            if is_buy:
+                exec_price = ref_price * self._slip_up
+                if exec_price * qty_raw * self._fee_mult > self.cash + 1e-9:
+                    return 2, exec_price, exec_price, qty_raw
+            else:
+                exec_price = ref_price * self._slip_dn
+            return 0, exec_price, exec_price, qty_raw
+
+        # Camino compilado: mismo modelo sobre floats planos (solo compensa con Numba)
+        if NUMBA_AVAILABLE:
+            return _exec_model_kernel(
+                is_buy,
+                ref_price,
+                qty_raw,
+                self._slip_up,
+                self._slip_dn,
+                self._fee_mult,
+                self.cash,
+                True,
+                *self._rule_units,
+            )
+
+        # 1) Slippage
+        exec_price_raw = ref_price * (self._slip_up if is_buy else self._slip_dn)
+
+        # 2) Redondeos según reglas del exchange
+        exec_price, qty_rounded, ok = apply_exchange_rules_f64(exec_price_raw, qty_raw, rules)
+
+        # 3) Checks en orden de prioridad; el primero que falla da el motivo
+        if qty_rounded <= 0:
+            code = 1  # tras redondeo, la cantidad debe ser > 0
+        elif is_buy and exec_price * qty_rounded * self._fee_mult > self.cash + 1e-9:
+            code = 2  # cash suficiente en BUY (incluye fee explícita)
+        elif not ok:
+            code = 3  # reglas de exchange (minNotional/minQty)
+        else:
+            code = 0
+        return code, exec_price_raw, exec_price, qty_rounded
+
     def _apply_execution_model(
         self,
         side: Literal["BUY", "SELL"],
@@ -255,19 +912,31 @@ class Portfolio:
         qty_raw: float,
     ) -> ExecPreview:
         """
-        Aplica el **modelo de ejecución** sin mutar estado:
-          1) Aplica slippage (bps) al precio de referencia.
-          2) Redondea precio (tickSize) y cantidad (stepSize) según reglas (si hay).
-          3) Valida minQty/minNotional y cash (para BUY).
-          4) Devuelve un `ExecPreview` con todos los detalles.
+        Vista previa del **modelo de ejecución** (`_exec_math`) como `ExecPreview`, con
+        todos los detalles (slippage, redondeos, notional). No muta estado.
 
         Si algo no cuadra (qty<=0, precio<=0, falta cash, minNotional...), devuelve `valid=False`.
         """
-        # Validación básica
-        if qty_raw <= 0 or ref_price <= 0:
+        code, exec_price_raw, exec_price, qty_rounded = self._exec_math(
+            side == "BUY", ref_price, qty_raw
+        )
+        return self._make_preview(code, ref_price, qty_raw, exec_price_raw, exec_price, qty_rounded)
+
+    def _make_preview(
+        self,
+        code: int,
+        ref_price: float,
+        qty_raw: float,
+        exec_price_raw: float,
+        exec_price: float,
+        qty_rounded: float,
+    ) -> ExecPreview:
+        """Envuelve el resultado de `_exec_math` en un `ExecPreview` completo."""
+        if code == 4:
+            # Entrada inválida: sin slippage ni cantidad, igual que `_apply_execution_model_batch`
             return ExecPreview(
                 valid=False,
-                reason="qty/ref_price no válidos",
+                reason=_EXEC_REASONS[4],
                 intended_price=ref_price,
                 exec_price_raw=ref_price,
                 exec_price=ref_price,
@@ -279,92 +948,89 @@ class Portfolio:
                 notional_before_round=0.0,
                 notional_after_round=0.0,
             )
+        return ExecPreview(
+            valid=code == 0,
+            reason=_EXEC_REASONS[code],
+            intended_price=ref_price,
+            exec_price_raw=exec_price_raw,
+            exec_price=exec_price,
+            qty_raw=qty_raw,
+            qty_rounded=qty_rounded,
+            price_round_diff=exec_price_raw - exec_price,
+            qty_round_diff=qty_raw - qty_rounded,
+            slippage_bps=self.slippage_bps,
+            notional_before_round=exec_price_raw * qty_raw,
+            notional_after_round=exec_price * qty_rounded,
+        )
+
+    def _apply_execution_model_batch(
+        self,
+        sides: np.ndarray,
+        ref_prices: np.ndarray,
+        qtys: np.ndarray,
+    ) -> ExecPreviewBatch:
+        """
+        Modelo de ejecución para un lote de órdenes (p. ej. varias órdenes en la misma
+        barra), en una sola pasada NumPy y sin mutar estado.
+
+        - `sides`: array bool (True = BUY, False = SELL).
+        - Slippage, redondeos (tick/step) y minQty/minNotional son los mismos que en
+          `_apply_execution_model`, aplicados elemento a elemento.
+        - El cash se consume **en orden**: cada BUY se valida contra el `np.cumsum` de
+          (notional + fee) de las compras anteriores del lote. Es conservador: una compra
+          rechazada por cash sigue contando en el acumulado, así que a partir de la primera
+          que no cabe se rechazan todas las siguientes.
+
+        Para una sola orden el resultado coincide con `_apply_execution_model`.
+        """
+        is_buy = np.asarray(sides, dtype=bool)
+        ref = np.asarray(ref_prices, dtype=np.float64)
+        q_raw = np.asarray(qtys, dtype=np.float64)
+        bad_input = (q_raw <= 0) | (ref <= 0)
 
         # 1) Slippage
-        slip = self.slippage_bps / 10_000.0
-        exec_price_raw = ref_price * (1 + slip) if side == "BUY" else ref_price * (1 - slip)
+        exec_price_raw = ref * np.where(is_buy, self._slip_up, self._slip_dn)
 
         # 2) Redondeos según reglas del exchange (si existen)
         if self.rules is not None:
-            p_dec, q_dec, ok = apply_exchange_rules(
-                price=exec_price_raw, qty=qty_raw, rules=self.rules
+            exec_price, qty_rounded, ok = apply_exchange_rules_batch(
+                exec_price_raw, q_raw, self.rules
             )
-            exec_price = float(p_dec)
-            qty_rounded = float(q_dec)
         else:
             exec_price = exec_price_raw
-            qty_rounded = qty_raw
-            ok = True  # sin reglas, asumimos válido
+            qty_rounded = q_raw
+            ok = np.ones(len(q_raw), dtype=bool)
 
-        price_round_diff = exec_price_raw - exec_price
-        qty_round_diff = qty_raw - qty_rounded
-        notional_before = exec_price_raw * qty_raw
         notional_after = exec_price * qty_rounded
 
-        # 3) Tras redondeo, la cantidad debe ser > 0
-        if qty_rounded <= 0:
-            return ExecPreview(
-                valid=False,
-                reason="qty_rounded == 0 tras stepSize",
-                intended_price=ref_price,
-                exec_price_raw=exec_price_raw,
-                exec_price=exec_price,
-                qty_raw=qty_raw,
-                qty_rounded=qty_rounded,
-                price_round_diff=price_round_diff,
-                qty_round_diff=qty_round_diff,
-                slippage_bps=self.slippage_bps,
-                notional_before_round=notional_before,
-                notional_after_round=notional_after,
-            )
-
-        # 4) Cash suficiente en BUY (incluye fee explícita)
-        if side == "BUY":
-            fee_factor = 1.0 + (self.fee_bps / 10_000.0)
-            if notional_after * fee_factor > (self.cash + 1e-9):
-                return ExecPreview(
-                    valid=False,
-                    reason="cash insuficiente (notional + fee)",
-                    intended_price=ref_price,
-                    exec_price_raw=exec_price_raw,
-                    exec_price=exec_price,
-                    qty_raw=qty_raw,
-                    qty_rounded=qty_rounded,
-                    price_round_diff=price_round_diff,
-                    qty_round_diff=qty_round_diff,
-                    slippage_bps=self.slippage_bps,
-                    notional_before_round=notional_before,
-                    notional_after_round=notional_after,
-                )
-
-        # 5) Reglas de exchange (minNotional/minQty) ya validadas en apply_exchange_rules
-        if self.rules is not None and not ok:
-            return ExecPreview(
-                valid=False,
-                reason="reglas exchange: minNotional/minQty",
-                intended_price=ref_price,
-                exec_price_raw=exec_price_raw,
-                exec_price=exec_price,
-                qty_raw=qty_raw,
-                qty_rounded=qty_rounded,
-                price_round_diff=price_round_diff,
-                qty_round_diff=qty_round_diff,
-                slippage_bps=self.slippage_bps,
-                notional_before_round=notional_before,
-                notional_after_round=notional_after,
-            )
-
-        # Si todo OK, devolvemos vista previa válida
-        return ExecPreview(
-            valid=True,
-            reason=None,
-            intended_price=ref_price,
+        # 3) Cash acumulado de las compras, en el orden del lote
+        buy_cost = np.where(is_buy & ~bad_input & (qty_rounded > 0), notional_after, 0.0)
+        no_cash = is_buy & (np.cumsum(buy_cost * self._fee_mult) > self.cash + 1e-9)
+
+        # 4) Códigos en orden de prioridad (el primero que falla manda)
+        code = np.select(
+            [bad_input, qty_rounded <= 0, no_cash, ~ok],
+            [4, 1, 2, 3],
+            default=0,
+        ).astype(np.int8)
+
+        # Las entradas inválidas se reportan como en el camino escalar (sin slippage)
+        exec_price_raw = np.where(bad_input, ref, exec_price_raw)
+        exec_price = np.where(bad_input, ref, exec_price)
+        qty_rounded = np.where(bad_input, 0.0, qty_rounded)
+        notional_before = np.where(bad_input, 0.0, exec_price_raw * q_raw)
+        notional_after = np.where(bad_input, 0.0, notional_after)
+
+        return ExecPreviewBatch(
+            valid=code == 0,
+            reason_code=code,
+            intended_price=ref,
             exec_price_raw=exec_price_raw,
             exec_price=exec_price,
-            qty_raw=qty_raw,
+            qty_raw=q_raw,
             qty_rounded=qty_rounded,
-            price_round_diff=price_round_diff,
-            qty_round_diff=qty_round_diff,
+            price_round_diff=exec_price_raw - exec_price,
+            qty_round_diff=q_raw - qty_rounded,
             slippage_bps=self.slippage_bps,
             notional_before_round=notional_before,
             notional_after_round=notional_after,
@@ -383,18 +1049,27 @@ class Portfolio:
         if qty <= 0:
             return
 
-        prev = self._apply_execution_model(side="BUY", ref_price=price, qty_raw=qty)
-        if not prev.valid:
-            logger.info(f"[BUY omitido] {prev.reason} | qty_raw={qty:.8f} ref={price:.2f}")
+        # Modelo de ejecución; a partir de aquí price/qty son los finales (slippage+redondeos)
+        ref_price, qty_raw = price, qty
+        if self._fast_path:
+            # Sin reglas/slippage/fees el modelo es la identidad: solo precio y cash
+            code = 4 if price <= 0 else 2 if price * qty > self.cash + 1e-9 else 0
+            exec_price_raw = price
+        else:
+            code, exec_price_raw, price, qty = self._exec_math(True, ref_price, qty_raw)
+        if self.record_previews:
+            self.previews.append(
+                self._make_preview(code, ref_price, qty_raw, exec_price_raw, price, qty)
+            )
+        if code:
+            logger.info(
+                "[BUY omitido] %s | qty_raw=%.8f ref=%.2f", _EXEC_REASONS[code], qty_raw, ref_price
+            )
             return
 
-        # Usamos los valores finales de ejecución (post slippage + redondeos)
-        price = prev.exec_price
-        qty = prev.qty_rounded
-
         # Notional y comisiones
         notional = qty * price
-        fee = self._fee_from_notional(notional)
+        fee = notional * self._fee_rate  # fee = notional * fee_bps / 10_000
         total = notional + fee
 
         # Check defensivo extra (debería estar cubierto en preview)
@@ -409,76 +1084,62 @@ class Portfolio:
             # Si no había posición, el avg_price es directamente el precio de ejecución
             self.avg_price = price
         else:
-            # Recalcular promedio ponderado
-            self.avg_price = (self.avg_price * self.qty + price * qty) / new_qty
+            # Recalcular promedio ponderado (price * qty + coste previo, fusionado si hay fma)
+            self.avg_price = _fma(price, qty, self.avg_price * self.qty) / new_qty
         self.qty = new_qty
         self.last_price = price  # para que equity() refleje el nuevo nivel
         eq = self.equity(price)
 
         # --- Registro del trade ---
-        tr = Trade(
-            ts=ts,
-            symbol=self.symbol,
-            side="BUY",
-            qty=qty,
-            price=price,
-            fee=fee,
-            cash_after=float(self.cash),
-            qty_after=float(self.qty),
-            equity_after=float(eq),
-            realized_pnl=0.0,
-            cum_realized_pnl=self.realized_pnl,
-            note=note,
-        )
+        if not self.record_meta:
+            self._record(ts, _SIDE_BUY, qty, price, fee, eq, 0.0, note)
+            return
 
         # fee_bps “real” sobre el notional ejecutado tras redondeos (útil para auditoría)
-        fee_bps_calc = 1e4 * (fee / prev.notional_after_round) if prev.notional_after_round else 0.0
-
-        # Metadatos enriquecidos + snapshot de reglas + schema_version
-        meta = {
-            "intended_price": prev.intended_price,
-            "exec_price_raw": prev.exec_price_raw,
-            "price_round_diff": prev.price_round_diff,
-            "qty_raw": prev.qty_raw,
-            "qty_rounded": prev.qty_rounded,
-            "qty_round_diff": prev.qty_round_diff,
-            "slippage_bps": prev.slippage_bps,
-            "notional_before_round": prev.notional_before_round,
-            "notional_after_round": prev.notional_after_round,
-            "rule_check": "OK" if prev.valid else prev.reason,
-            "run_id": self.run_id,
-            "fee_bps": fee_bps_calc,
-            "schema_version": SCHEMA_VERSION,
-            **self._rules_snapshot(),
-        }
-        self._record(tr, meta=meta)
+        fee_bps_calc = 1e4 * (fee / notional) if notional else 0.0
+
+        # Metadatos enriquecidos (+ snapshot de reglas, run_id, schema_version)
+        exec_info = (ref_price, qty_raw, exec_price_raw, price, qty, fee_bps_calc)
+        self._record(ts, _SIDE_BUY, qty, price, fee, eq, 0.0, note, exec_info)
 
-    def sell(self, ts: pd.Timestamp, qty: float, price: float, note: str = "") -> None:
+    def sell(
+        self, ts: pd.Timestamp, qty: float, price: float, note: str = "", strict: bool = False
+    ) -> None:
         """
         Orden de venta:
-          - Verifica que hay suficiente cantidad (qty <= posición).
+          - Limita la cantidad a la posición (qty <= posición); con `strict=True`, pedir
+            más de lo que hay lanza `ValueError` en vez de recortar.
           - Aplica modelo de ejecución.
           - Si es válida, suma efectivo (menos fee), reduce qty y actualiza realized PnL.
           - Registra el trade con metadatos completos.
         """
         if qty <= 0:
             return
-        if qty > self.qty + 1e-12:
+        if strict and qty > self.qty + 1e-12:
             raise ValueError("No hay cantidad suficiente para vender.")
+        qty = min(qty, self.qty)  # sin rama: nunca se vende más que la posición
+        if qty <= 0:
+            return
 
-        prev = self._apply_execution_model(side="SELL", ref_price=price, qty_raw=qty)
-        if not prev.valid:
-            logger.info(f"[SELL omitido] {prev.reason} | qty_raw={qty:.8f} ref={price:.2f}")
+        ref_price, qty_raw = price, qty
+        if self._fast_path:
+            code, exec_price_raw, qty_rounded = (4 if price <= 0 else 0), price, qty
+        else:
+            code, exec_price_raw, price, qty_rounded = self._exec_math(False, ref_price, qty_raw)
+        if self.record_previews:
+            self.previews.append(
+                self._make_preview(code, ref_price, qty_raw, exec_price_raw, price, qty_rounded)
+            )
+        if code:
+            logger.info(
+                "[SELL omitido] %s | qty_raw=%.8f ref=%.2f", _EXEC_REASONS[code], qty_raw, ref_price
+            )
             return
 
-        price = prev.exec_price
-        qty = prev.qty_rounded
-        if qty > self.qty + 1e-12:
-            # Protección por si el redondeo sube ligeramente la cantidad
-            qty = min(qty, self.qty)
+        qty = min(qty_rounded, self.qty)  # por si el redondeo sube ligeramente la cantidad
 
         notional = qty * price
-        fee = self._fee_from_notional(notional)
+        fee = notional * self._fee_rate  # fee = notional * fee_bps / 10_000
 
         # PnL realizado: (precio - avg_price) * qty  [con opción de restar fees]
         realized = (price - self.avg_price) * qty
@@ -498,39 +1159,14 @@ class Portfolio:
         self.last_price = price
         eq = self.equity(price)
 
-        tr = Trade(
-            ts=ts,
-            symbol=self.symbol,
-            side="SELL",
-            qty=qty,
-            price=price,
-            fee=fee,
-            cash_after=float(self.cash),
-            qty_after=float(self.qty),
-            equity_after=float(eq),
-            realized_pnl=realized,
-            cum_realized_pnl=self.realized_pnl,
-            note=note,
-        )
+        if not self.record_meta:
+            self._record(ts, _SIDE_SELL, qty, price, fee, eq, realized, note)
+            return
 
-        fee_bps_calc = 1e4 * (fee / prev.notional_after_round) if prev.notional_after_round else 0.0
-        meta = {
-            "intended_price": prev.intended_price,
-            "exec_price_raw": prev.exec_price_raw,
-            "price_round_diff": prev.price_round_diff,
-            "qty_raw": prev.qty_raw,
-            "qty_rounded": prev.qty_rounded,
-            "qty_round_diff": prev.qty_round_diff,
-            "slippage_bps": prev.slippage_bps,
-            "notional_before_round": prev.notional_before_round,
-            "notional_after_round": prev.notional_after_round,
-            "rule_check": "OK" if prev.valid else prev.reason,
-            "run_id": self.run_id,
-            "fee_bps": fee_bps_calc,
-            "schema_version": SCHEMA_VERSION,
-            **self._rules_snapshot(),
-        }
-        self._record(tr, meta=meta)
+        notional_after = price * qty_rounded
+        fee_bps_calc = 1e4 * (fee / notional_after) if notional_after else 0.0
+        exec_info = (ref_price, qty_raw, exec_price_raw, price, qty_rounded, fee_bps_calc)
+        self._record(ts, _SIDE_SELL, qty, price, fee, eq, realized, note, exec_info)
 
     # ----------------------------------------------------------------------------------
     # Sizing: calcular cantidad asequible dado un precio y un % del cash
@@ -545,105 +1181,320 @@ class Portfolio:
         """
         if price <= 0 or alloc_pct <= 0:
             return 0.0
-        fee_mult = 1.0 + (self.fee_bps / 10_000.0)
         budget = self.cash * alloc_pct
-        return max(0.0, budget / (price * fee_mult))
+        return max(0.0, budget / (price * self._fee_mult))
+
+    # ----------------------------------------------------------------------------------
+    # Simulación vectorizada: toda la serie de señales en una pasada NumPy
+    # ----------------------------------------------------------------------------------
+    @classmethod
+    def simulate_vectorized(
+        cls,
+        prices: np.ndarray,
+        side: np.ndarray,
+        qty: np.ndarray | float,
+        fee_bps: float = 0.0,
+        slippage_bps: float = 0.0,
+        *,
+        ts: np.ndarray | None = None,
+        cash: float = 10_000.0,
+        symbol: str = "BTCUSDT",
+        run_id: str | None = None,
+        realized_pnl_net_fees: bool = False,
+    ) -> Portfolio:
+        """
+        Ejecuta una serie completa de señales sin bucle por barra y devuelve el `Portfolio`
+        resultante (estado final, trades en el buffer columnar y equity curve).
+
+        - `prices`: precio de referencia por barra (p. ej. close).
+        - `side`:   señal por barra: >0 BUY, <0 SELL, 0 sin orden.
+        - `qty`:    cantidad por barra (array o escalar).
+        - `ts`:     timestamps por barra (por defecto 0..N-1).
+
+        Trayectorias con operaciones acumuladas:
+          exec_price = prices * (1 + slip * sign);  fee = exec_price * qty * fee_bps / 1e4
+          cash = cash0 + cumsum(-sign * notional - fee);  qty = cumsum(sign * qty)
+          equity = cash + qty * prices  (al cierre, tras la orden de la barra)
+
+        A diferencia de `buy`/`sell`, no aplica reglas del exchange ni valida cash o
+        posición: la serie de señales se asume factible. El PnL realizado (coste medio)
+        sale de `_avg_cost_kernel`, que recorre solo las filas con trade.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        n_bars = len(prices)
+        sign = np.sign(np.asarray(side)).astype(np.int8)
+        qty_arr = np.broadcast_to(np.asarray(qty, dtype=np.float64), prices.shape)
+        traded = (sign != 0) & (qty_arr > 0)
+        sign = np.where(traded, sign, 0)
+
+        p = cls(
+            cash=cash,
+            symbol=symbol,
+            fee_bps=fee_bps,
+            slippage_bps=slippage_bps,
+            run_id=run_id,
+            realized_pnl_net_fees=realized_pnl_net_fees,
+        )
+
+        # Trayectorias por barra
+        exec_price = prices * (1.0 + p._slip * sign)
+        notional = np.where(traded, exec_price * qty_arr, 0.0)
+        fee = notional * p._fee_rate
+        cash_path = cash + np.cumsum(-sign * notional - fee)
+        qty_path = np.cumsum(sign * qty_arr)
+        equity = cash_path + qty_path * prices
+
+        # Trades: solo las barras con orden, escritas columna a columna en el buffer
+        idx = np.flatnonzero(traded)
+        m = len(idx)
+        is_buy = sign[idx] > 0
+        t_price, t_qty, t_fee = exec_price[idx], qty_arr[idx], fee[idx]
+        realized, cum_realized, avg_price = _avg_cost_kernel(
+            is_buy, t_qty, t_price, t_fee, realized_pnl_net_fees
+        )
+        ts_arr = np.arange(n_bars) if ts is None else np.asarray(ts)
+
+        values: dict[str, Any] = {
+            "ts": ts_arr[idx],
+            "symbol": p._symbol_code(symbol),
+            "side": np.where(is_buy, _SIDE_BUY, _SIDE_SELL),
+            "qty": t_qty,
+            "price": t_price,
+            "fee": t_fee,
+            "cash_after": cash_path[idx],
+            "qty_after": qty_path[idx],
+            "equity_after": cash_path[idx] + qty_path[idx] * t_price,
+            "realized_pnl": realized,
+            "cum_realized_pnl": cum_realized,
+            "note": "",
+        }
+        if p.record_meta:
+            t_notional = notional[idx]
+            values.update(
+                {
+                    **p._meta_template,
+                    "intended_price": prices[idx],
+                    "exec_price_raw": t_price,
+                    "price_round_diff": 0.0,
+                    "qty_raw": t_qty,
+                    "qty_rounded": t_qty,
+                    "qty_round_diff": 0.0,
+                    "notional_before_round": t_notional,
+                    "notional_after_round": t_notional,
+                    "fee_bps": np.divide(
+                        1e4 * t_fee, t_notional, out=np.zeros(m), where=t_notional > 0
+                    ),
+                }
+            )
+        else:
+            values.update(_META_DEFAULTS)
+        p._record_many(values, m)
+
+        # Estado final y equity curve (un único bloque ya consolidado)
+        if n_bars:
+            p.cash = float(cash_path[-1])
+            p.qty = float(qty_path[-1])
+            p.last_price = float(prices[-1])
+        p.avg_price = float(avg_price)
+        p.realized_pnl = float(cum_realized[-1]) if m else 0.0
+        p._eq_chunks = [(ts_arr.astype(object), equity)]
+        return p
 
     # ----------------------------------------------------------------------------------
     # Reporting: equity curve, trades dataframe, summary
     # ----------------------------------------------------------------------------------
+    def compute_equity_curve(self, prices: pd.Series) -> pd.Series:
+        """
+        Equity curve a partir de una serie de precios (índice = timestamps de barra) y los
+        trades ya registrados, sin recorrer barras en Python.
+
+        Para cada barra `t`, cash y qty son los del último trade con `ts < t` (búsqueda
+        binaria con `searchsorted` sobre los `ts` de trades + gather de `cash_after` /
+        `qty_after`); antes del primer trade, el estado inicial. Así coincide con lo que
+        registra el engine: el punto de la barra `t` se toma antes de `on_bar`, es decir,
+        sin los trades ejecutados en esa misma barra.
+
+            equity[t] = cash[t] + qty[t] * prices[t]
+        """
+        n = self._n
+        cols = self._columns
+        trade_ts = pd.Index(cols["ts"][:n])
+        cash_after = cols["cash_after"][:n]
+        qty_after = cols["qty_after"][:n]
+        if not self._ts_sorted:
+            order = trade_ts.argsort(kind="stable")
+            trade_ts, cash_after, qty_after = trade_ts[order], cash_after[order], qty_after[order]
+        if isinstance(prices.index, pd.DatetimeIndex):
+            trade_ts = pd.to_datetime(trade_ts)
+
+        pos = trade_ts.searchsorted(prices.index, side="left") - 1
+        has_trade = pos >= 0
+        pos = np.maximum(pos, 0)
+        if n:
+            cash = np.where(has_trade, cash_after[pos], self.starting_cash)
+            qty = np.where(has_trade, qty_after[pos], self._starting_qty)
+        else:
+            cash = np.full(len(prices), self.starting_cash)
+            qty = np.full(len(prices), self._starting_qty)
+        values = prices.to_numpy(dtype=np.float64)
+        return pd.Series(cash + qty * values, index=prices.index, name="equity")
+
     def equity_curve_dataframe(self) -> pd.DataFrame:
         """
         Devuelve la curva de equity registrada por el engine como DataFrame:
           columnas: ["ts", "equity"], ordenada por tiempo.
         Si aún no hay puntos, devuelve un DataFrame vacío con esas columnas.
+
+        El engine registra en orden cronológico, así que solo se ordena si la comprobación
+        O(N) de monotonía falla (en lugar de pagar siempre un sort O(N log N)).
         """
-        if not self._equity_curve:
-            return pd.DataFrame(columns=["ts", "equity"])
-        return (
-            pd.DataFrame(self._equity_curve, columns=["ts", "equity"])
-            .sort_values("ts")
-            .reset_index(drop=True)
-        )
+        ts, val = self.flush()
+        if len(ts) == 0:
+            return _EMPTY_EQUITY_DF.copy()
+        df = pd.DataFrame({"ts": ts, "equity": val})
+        if not df["ts"].is_monotonic_increasing:
+            df = df.sort_values("ts").reset_index(drop=True)
+        return df
 
     def trades_dataframe(self) -> pd.DataFrame:
         """
-        Devuelve un DataFrame de trades combinando `Trade` + metadatos enriquecidos.
+        Devuelve un DataFrame de trades a partir del buffer columnar (`Trade` + metadatos).
 
-        Si hay metadatos (self._trade_meta) con la misma longitud que `trades`,
-        se concatenan columna a columna. Si no, devuelve las columnas base.
+        Se construye con un corte `[:n]` por columna: sin recorrer objetos fila a fila
+        ni concatenar DataFrames.
 
         Columnas base (coinciden con dataclass Trade):
             ["ts","symbol","side","qty","price","fee",
              "cash_after","qty_after","equity_after",
              "realized_pnl","cum_realized_pnl","note"]
 
-        Metadatos adicionales (si disponibles):
+        Metadatos adicionales:
             ["intended_price","exec_price_raw","price_round_diff",
              "qty_raw","qty_rounded","qty_round_diff","slippage_bps",
              "notional_before_round","notional_after_round","rule_check",
-             "run_id","fee_bps","tickSize_used","stepSize_used",
-             "minNotional_used","schema_version"]
-        """
-        base_cols = [
-            "ts",
-            "symbol",
-            "side",
-            "qty",
-            "price",
-            "fee",
-            "cash_after",
-            "qty_after",
-            "equity_after",
-            "realized_pnl",
-            "cum_realized_pnl",
-            "note",
-        ]
-
-        # Si no hay trades aún, devolvemos cabecera completa vacía (base + extra),
-        # porque los tests esperan esas columnas aunque no haya filas.
-        if not self.trades:
-            extra_cols = [
-                "intended_price",
-                "exec_price_raw",
-                "price_round_diff",
-                "qty_raw",
-                "qty_rounded",
-                "qty_round_diff",
-                "slippage_bps",
-                "notional_before_round",
-                "notional_after_round",
-                "rule_check",
-                "run_id",
-                "fee_bps",
-                "schema_version",
-                "tickSize_used",
-                "stepSize_used",
-                "minNotional_used",
-                "pnl",
-            ]
-            return pd.DataFrame(columns=base_cols + extra_cols)
-
-        # Construimos el DF base a partir de los dataclasses Trade
-        df = (
-            pd.DataFrame([t.__dict__ for t in self.trades]).sort_values("ts").reset_index(drop=True)
-        )
+             "run_id","fee_bps","schema_version","tickSize_used","stepSize_used",
+             "minNotional_used"]
 
-        # Si tenemos metadatos alineados, los añadimos; si no, devolvemos base ordenada
-        if self._trade_meta and len(self._trade_meta) == len(self.trades):
-            meta_df = pd.DataFrame(self._trade_meta).reindex(df.index)
-            df = pd.concat([df, meta_df], axis=1)
-        else:
-            for c in base_cols:
-                if c not in df.columns:
-                    df[c] = None
-            df = df[base_cols]
+        Más la columna derivada "pnl" (= realized_pnl).
+
+        `symbol`, `side` y `rule_check` salen como `category` (códigos enteros del buffer +
+        una tabla de categorías); al exportar a CSV se escriben como texto igual que antes.
+
+        Los dtypes salen del esquema fijo del buffer (`_TRADE_COLS`), no de inferir fila a
+        fila: sin trades se devuelve la cabecera completa con los mismos dtypes (float64,
+        category...) que con datos, en lugar de columnas `object`.
+
+        El frame se cachea por número de trades (el buffer solo crece por el final): si no
+        se ha registrado ninguno desde la última llamada se devuelve una copia del anterior,
+        sin reconstruirlo (`_copy_frame`: superficial con Copy-on-Write, profunda en pandas
+        2.x sin él); modificarla no altera la cache.
+        """
+        n = self._n
+        cached = self._trades_df_cache
+        if cached is not None and cached[0] == n:
+            return _copy_frame(cached[1])
+
+        self._sync_run_meta()
+        cols: dict[str, Any] = {name: arr[:n] for name, arr in self._columns.items()}
+        # Columnas codificadas -> categóricas (int codes + una tabla de categorías)
+        cols["symbol"] = pd.Categorical.from_codes(cols["symbol"], categories=self._symbols)
+        cols["side"] = pd.Categorical.from_codes(cols["side"], categories=_SIDES)
+        cols["rule_check"] = pd.Categorical.from_codes(cols["rule_check"], categories=_RULE_CHECKS)
+        df = pd.DataFrame(cols)
+        # Los trades se registran en orden cronológico: `_record` marca `_ts_sorted=False`
+        # solo si llega uno fuera de orden, y únicamente entonces se ordena (y reindexa).
+        if not self._ts_sorted:
+            df = df.sort_values("ts", kind="stable").reset_index(drop=True)
 
         # pnl = realized_pnl por convención (BUY=0, SELL=realized)
-        if "realized_pnl" in df.columns and "pnl" not in df.columns:
-            df["pnl"] = df["realized_pnl"].fillna(0.0)
+        df["pnl"] = df["realized_pnl"].fillna(0.0)
 
-        return df
+        self._trades_df_cache = (n, df)
+        return _copy_frame(df)
+
+    def trades_array(self) -> np.ndarray:
+        """
+        Trades (campos base) como array estructurado NumPy (`_TRADE_RECORD_DTYPE`): un
+        registro empaquetado por fila, sin objetos Python, ordenado por tiempo.
+
+        `ts` se convierte a `datetime64[ns]` en UTC (sin zona); `side` a "BUY"/"SELL".
+        Útil para kernels NumPy/Numba que recorren trades; para análisis con metadatos
+        usar `trades_dataframe()`.
+        """
+        n = self._n
+        cols = self._columns
+        out = np.empty(n, dtype=_TRADE_RECORD_DTYPE)
+        if n == 0:
+            return out
+        out["ts"] = pd.to_datetime(cols["ts"][:n], utc=True).tz_localize(None).to_numpy()
+        out["side"] = np.asarray(_SIDES)[cols["side"][:n]]
+        for name in _TRADE_RECORD_FLOATS:
+            out[name] = cols[name][:n]
+        if not self._ts_sorted:
+            out = out[np.argsort(out["ts"], kind="stable")]
+        return out
+
+    # ----------------------------------------------------------------------------------
+    # Exportación columnar (Parquet vía pyarrow, CSV como alternativa)
+    # ----------------------------------------------------------------------------------
+    def export_trades(self, path: str | Path, fmt: Literal["parquet", "csv"] = "parquet") -> Path:
+        """
+        Exporta los trades a `path` en Parquet (zstd) o CSV y devuelve la ruta escrita.
+
+        En Parquet la tabla Arrow se construye directamente desde el buffer columnar, sin
+        pasar por `trades_dataframe()`: las columnas codificadas (`symbol`, `side`,
+        `rule_check`) se escriben como diccionarios Arrow (códigos + categorías).
+        """
+        path = Path(path)
+        if fmt == "csv":
+            self.trades_dataframe().to_csv(path, index=False)
+            return path
+
+        _require_pyarrow()
+        self._sync_run_meta()
+        n = self._n
+        cats = {"symbol": self._symbols, "side": _SIDES, "rule_check": _RULE_CHECKS}
+        arrays: dict[str, Any] = {}
+        for name, arr in self._columns.items():
+            col = arr[:n]
+            if name in cats:
+                # Códigos negativos (sin metadatos) = nulos
+                mask = col < 0
+                arrays[name] = pa.DictionaryArray.from_arrays(
+                    col, list(cats[name]), mask=mask if mask.any() else None
+                )
+            else:
+                arrays[name] = pa.array(col, from_pandas=True)
+        pnl = self._columns["realized_pnl"][:n]
+        arrays["pnl"] = pa.array(np.where(np.isnan(pnl), 0.0, pnl))
+
+        table = pa.Table.from_pydict(arrays)
+        if not self._ts_sorted:
+            ts = pd.Index(self._columns["ts"][:n])
+            table = table.take(ts.argsort(kind="stable"))
+        pq.write_table(table, path, compression="zstd")
+        return path
+
+    def export_equity_curve(
+        self, path: str | Path, fmt: Literal["parquet", "csv"] = "parquet"
+    ) -> Path:
+        """
+        Exporta la curva de equity a `path` en Parquet (zstd) o CSV y devuelve la ruta.
+        En Parquet se escribe un único `RecordBatch` con `ts` (datetime64[ns]) y `equity`.
+        """
+        path = Path(path)
+        df = self.equity_curve_dataframe()
+        if fmt == "csv":
+            df.to_csv(path, index=False)
+            return path
+
+        _require_pyarrow()
+        batch = pa.RecordBatch.from_arrays(
+            [pa.array(pd.to_datetime(df["ts"])), pa.array(df["equity"].to_numpy(np.float64))],
+            names=["ts", "equity"],
+        )
+        pq.write_table(pa.Table.from_batches([batch]), path, compression="zstd")
+        return path
 
     def pnl_total(self) -> float:
         """PnL total = equity() - starting_cash (usa last_price actual para MTM)."""
@@ -13,37 +13,75 @@ Objetivos del módulo
    - Redondear `price` a `tick_size` (hacia abajo).
    - Redondear `qty` a `step_size`  (hacia abajo).
    - Validar `min_qty` y `min_notional`.
-4) Cachear en disco (en `rules/<SYMBOL>_rules.json`) para evitar hits innecesarios a la API.
+4) Cachear en disco (en `rules/<SYMBOL>_rules.pkl`) para evitar hits innecesarios a la API.
 
 Integración
 -----------
 - `__main__.py`: llama `load_symbol_rules(...)` al arrancar y lo inyecta en
     `Portfolio.set_execution_rules(...)`.
-- `Portfolio._apply_execution_model(...)`: usa `apply_exchange_rules(price, qty, rules)` para
-    redondear y validar `minQty/minNotional` antes de ejecutar.
+- `Portfolio._apply_execution_model(...)`: usa `apply_exchange_rules_f64(price, qty, rules)`
+    para redondear y validar `minQty/minNotional` antes de ejecutar.
 
 Decisiones
 ----------
 - Redondeos son **floor** (ROUND_DOWN) al múltiplo permitido para no arriesgar rechazo del exchange.
 - `SymbolRules` es **dataclass frozen** (inmutable) => seguridad y trazabilidad.
-- Cache en JSON con strings para Decimals (sin pérdida de precisión).
+- Cache en pickle del propio `SymbolRules` (Decimals exactos, sin parseo de texto); las
+  caches JSON anteriores (strings para Decimals, `.json.zst` con zstandard) se siguen leyendo.
+- El camino caliente (una orden por barra) redondea en float64 con `_floor_to_step_f64`,
+  equivalente exacto del floor con `Decimal`; el camino `Decimal` queda para auditoría.
+  `is_order_valid_nb` / `apply_exchange_rules_nb` son sus versiones `@njit` sobre floats
+  planos, para usarlas dentro de kernels compilados.
 """
 
 from __future__ import annotations
 
+import functools
 import json
-from dataclasses import dataclass
+import math
+import mmap
+import pickle
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from decimal import ROUND_DOWN, Decimal
 from pathlib import Path
+from types import ModuleType
 from typing import Any
 
+import numpy as np
+
 from . import settings
-from .binance_client import BinanceClient
+from .jit import njit
+
+# orjson (extensión C) es opcional: extra `fastjson`. Sin él, json de la stdlib.
+try:
+    import orjson as _orjson
+
+    orjson: ModuleType | None = _orjson
+except Exception:  # pragma: no cover
+    orjson = None
 
+# zstandard también es opcional (extra `zstd`): con él la cache se guarda comprimida.
+try:
+    import zstandard as _zstd
+
+    zstd: ModuleType | None = _zstd
+except Exception:  # pragma: no cover
+    zstd = None
 
 # ======================================================================================
 # Representación de reglas por símbolo
 # ======================================================================================
+# Filtros crudos inmutables: ((filterType, ((clave, valor), ...)), ...)
+RawFilters = tuple[tuple[str, tuple[tuple[str, Any], ...]], ...]
+
+
+def _freeze_filters(filters: Mapping[str, Mapping[str, Any]]) -> RawFilters:
+    """Convierte `{filterType: {clave: valor}}` en tuplas de pares (hashable, compacto)."""
+    return tuple((name, tuple(f.items())) for name, f in filters.items())
+
+
 @dataclass(frozen=True)
 class SymbolRules:
     """
@@ -57,7 +95,22 @@ class SymbolRules:
     min_qty      : Optional[Decimal]  (LOT_SIZE.minQty, si existe)
     max_qty      : Optional[Decimal]  (LOT_SIZE.maxQty, si existe)
     min_notional : Optional[Decimal]  (NOTIONAL.minNotional o MIN_NOTIONAL.minNotional)
-    raw_filters  : Dict[str, Any]     (copia cruda para debugging/auditoría)
+    raw_filters  : RawFilters         (copia cruda para debugging/auditoría, congelada
+                                       como tuplas de pares (filterType, ((clave, valor), ...));
+                                       no participa en eq/hash: puede faltar en la cache, ver
+                                       `settings.INCLUDE_RAW_FILTERS_IN_CACHE`)
+
+    Derivados (campos `init=False`: fuera de __init__/eq/repr, se fijan en __post_init__)
+    -------------------------------------------------------------------------------------
+    f64_units    : Tuple[float, ...]
+        (tick_k, tick_scale, step_k, step_scale, min_qty, min_notional) en float64 para
+        el redondeo rápido (`_floor_to_step_f64`); se calcula una vez al construir.
+    tick_size_f / step_size_f : float
+        tick_size / step_size en float (informativo y para cálculos aproximados; los
+        redondeos exactos usan `f64_units`, ver `round_price_fast` / `round_qty_fast`).
+    _pack        : Tuple[Decimal, Decimal, Optional[Decimal], Optional[Decimal]]
+        (tick_size, step_size, min_qty, min_notional) en una tupla, para que el camino
+        `Decimal` (`apply_exchange_rules`) lo desempaquete de una vez.
     """
 
     symbol: str
@@ -66,23 +119,71 @@ class SymbolRules:
     min_qty: Decimal | None
     max_qty: Decimal | None
     min_notional: Decimal | None
-    raw_filters: dict[str, Any]
+    raw_filters: RawFilters = field(compare=False)
+    f64_units: tuple[float, float, float, float, float, float] = field(
+        init=False, repr=False, compare=False
+    )
+    tick_size_f: float = field(init=False, repr=False, compare=False)
+    step_size_f: float = field(init=False, repr=False, compare=False)
+    _pack: tuple[Decimal, Decimal, Decimal | None, Decimal | None] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        # Admite también el dict {filterType: filtro} (p. ej. desde JSON) y lo congela
+        if isinstance(self.raw_filters, Mapping):
+            object.__setattr__(self, "raw_filters", _freeze_filters(self.raw_filters))
+        tick_k, tick_scale = _step_units(self.tick_size)
+        step_k, step_scale = _step_units(self.step_size)
+        min_qty = float(self.min_qty) if self.min_qty is not None else 0.0
+        min_notional = float(self.min_notional) if self.min_notional is not None else 0.0
+        # frozen: los campos derivados se fijan con object.__setattr__
+        object.__setattr__(
+            self, "f64_units", (tick_k, tick_scale, step_k, step_scale, min_qty, min_notional)
+        )
+        object.__setattr__(self, "tick_size_f", float(self.tick_size))
+        object.__setattr__(self, "step_size_f", float(self.step_size))
+        object.__setattr__(
+            self, "_pack", (self.tick_size, self.step_size, self.min_qty, self.min_notional)
+        )
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Pickle solo de los campos declarados: al cargar pasa por __init__/__post_init__,
+        # así los derivados (`f64_units`, `_pack`...) nunca salen obsoletos de la cache.
+        return (
+            SymbolRules,
+            (
+                self.symbol,
+                self.tick_size,
+                self.step_size,
+                self.min_qty,
+                self.max_qty,
+                self.min_notional,
+                self.raw_filters,
+            ),
+        )
 
     # Serialización a JSON (guardamos Decimals como strings para no perder precisión)
-    def to_json(self) -> dict[str, Any]:
-        return {
+    def to_json(self, include_raw_filters: bool = True) -> dict[str, Any]:
+        d: dict[str, Any] = {
             "symbol": self.symbol,
             "tick_size": str(self.tick_size),
             "step_size": str(self.step_size),
             "min_qty": str(self.min_qty) if self.min_qty is not None else None,
             "max_qty": str(self.max_qty) if self.max_qty is not None else None,
             "min_notional": str(self.min_notional) if self.min_notional is not None else None,
-            "raw_filters": self.raw_filters,
         }
+        if include_raw_filters:
+            d["raw_filters"] = {name: dict(pairs) for name, pairs in self.raw_filters}
+        return d
 
     @staticmethod
     def from_json(d: dict[str, Any]) -> SymbolRules:
-        # Inversa de to_json
+        # Inversa de to_json. Con `raw_filters` los campos se derivan de ellos (los de
+        # primer nivel son un duplicado); sin ellos, de los campos de primer nivel.
+        raw = d.get("raw_filters")
+        if raw:
+            return SymbolRules.derive_from_filters(d["symbol"], raw.values())
         return SymbolRules(
             symbol=d["symbol"],
             tick_size=Decimal(d["tick_size"]),
@@ -90,7 +191,57 @@ class SymbolRules:
             min_qty=Decimal(d["min_qty"]) if d.get("min_qty") is not None else None,
             max_qty=Decimal(d["max_qty"]) if d.get("max_qty") is not None else None,
             min_notional=Decimal(d["min_notional"]) if d.get("min_notional") is not None else None,
-            raw_filters=d.get("raw_filters", {}),
+            raw_filters=(),
+        )
+
+    @staticmethod
+    def derive_from_filters(symbol: str, filters: Iterable[Mapping[str, Any]]) -> SymbolRules:
+        """
+        Construye las reglas a partir de la lista de filtros de Binance (`exchangeInfo`
+        o `raw_filters` de la cache), en una sola pasada: cada filtro se congela para
+        `raw_filters` (mismo resultado que `_freeze_filters`; un filterType repetido
+        conserva el último; uno sin filterType se ignora) y se extraen tickSize, stepSize,
+        minQty, maxQty y minNotional.
+        """
+        tick_size: Decimal | None = None
+        step_size: Decimal | None = None
+        min_qty: Decimal | None = None
+        max_qty: Decimal | None = None
+        min_notional: Decimal | None = None
+        raw: dict[str, tuple[tuple[str, Any], ...]] = {}
+
+        for f in filters:
+            ftype = f.get("filterType")
+            if not isinstance(ftype, str):
+                continue  # sin filterType no se puede clasificar ni indexar: se ignora
+            raw[ftype] = tuple(f.items())
+            if ftype == "PRICE_FILTER":
+                tick_size = _dec(f["tickSize"])
+            elif ftype in ("LOT_SIZE", "MARKET_LOT_SIZE"):
+                step_size = _dec(f["stepSize"])
+                if "minQty" in f:
+                    min_qty = _dec(f["minQty"])
+                if "maxQty" in f:
+                    max_qty = _dec(f["maxQty"])
+            elif ftype in ("NOTIONAL", "MIN_NOTIONAL"):
+                if "minNotional" in f:
+                    min_notional = _dec(f["minNotional"])
+
+        if tick_size is None or step_size is None:
+            msg = (
+                f"Faltan PRICE_FILTER/LOT_SIZE para {symbol}: "
+                f"tick_size={tick_size}, step_size={step_size}"
+            )
+            raise ValueError(msg)
+
+        return SymbolRules(
+            symbol=symbol,
+            tick_size=tick_size,
+            step_size=step_size,
+            min_qty=min_qty,
+            max_qty=max_qty,
+            min_notional=min_notional,
+            raw_filters=tuple(raw.items()),
         )
 
 
@@ -99,11 +250,27 @@ class SymbolRules:
 # ======================================================================================
 
 
+# Cache de conversiones a Decimal (precios/cantidades que se repiten entre barras). Se
+# vacía entera al llenarse: acotada y sin la contabilidad de un LRU.
+_DEC_CACHE: dict[tuple[type, Any], Decimal] = {}
+_DEC_CACHE_MAX = 4096
+
+
 def _dec(x: str | float | int | Decimal) -> Decimal:
     """
-    Normaliza a Decimal de forma segura.
+    Normaliza a Decimal de forma segura (`Decimal(str(x))`: un float da su repr más corto,
+    no su expansión binaria). Un `Decimal` se devuelve tal cual; el resto se cachea por
+    (tipo, valor) para no repetir `str()` + parseo con entradas repetidas.
     """
-    return Decimal(str(x))
+    if isinstance(x, Decimal):
+        return x
+    key = (x.__class__, x)
+    d = _DEC_CACHE.get(key)
+    if d is None:
+        if len(_DEC_CACHE) >= _DEC_CACHE_MAX:
+            _DEC_CACHE.clear()
+        d = _DEC_CACHE[key] = Decimal(str(x))
+    return d
 
 
 def _floor_to_step(value: Decimal, step: Decimal) -> Decimal:
@@ -117,7 +284,88 @@ def _floor_to_step(value: Decimal, step: Decimal) -> Decimal:
     if step <= 0:
         return value
     steps = (value / step).to_integral_value(rounding=ROUND_DOWN)  # número entero de pasos
-    return (steps * step).normalize()  # .normalize() quita ceros sobrantes
+    # Sin .normalize(): el exponente queda el de `step` (p. ej. 1.23 con step 0.01), que
+    # es lo que necesitan los productos posteriores; quitar ceros sería una pasada extra.
+    return steps * step
+
+
+# --------------------------------------------------------------------------------------
+# Redondeo en float64 (camino caliente): mismo resultado que `_floor_to_step` con Decimal
+# --------------------------------------------------------------------------------------
+# Holgura relativa para comparar el notional float contra minNotional (4 ULPs).
+_NOTIONAL_TOL = 1.0 - 4.0 * 2.220446049250313e-16
+
+
+def _step_units(step: Decimal) -> tuple[float, float]:
+    """
+    Descompone un tick/step decimal como `k * 10**-d` y devuelve `(k, 10**d)` en float.
+
+    Ej.: 0.01 -> (1.0, 100.0);  0.5 -> (5.0, 10.0);  10 -> (10.0, 1.0)
+    """
+    exp = int(step.normalize().as_tuple().exponent)
+    d = -exp if exp < 0 else 0
+    return float(step.scaleb(d)), float(10**d)
+
+
+@njit(cache=True)
+def _floor_to_step_f64(value: float, k: float, scale: float) -> float:
+    """
+    Floor de `value` (> 0) al múltiplo de `k / scale`, equivalente float exacto de
+    `float(_floor_to_step(_dec(value), step))` con `(k, scale) = _step_units(step)`.
+
+    - Los múltiplos se reconstruyen como `(m * k) / scale`: división IEEE de un entero
+      exacto por una potencia de 10 exacta => el mismo float que `float(Decimal(...))`.
+    - Se parte del múltiplo más cercano `m` y se baja uno si su float queda por encima de
+      `value`. Como el redondeo a float es monótono, esto reproduce el floor del decimal
+      original (p. ej. 0.11560999999999999 con step 0.00001 -> 0.1156, no 0.11561).
+      Un `math.floor(value / step) * step` directo fallaría justo en esos casos.
+    """
+    if k <= 0.0:
+        return value
+    m = math.floor(value * scale / k + 0.5)
+    r = (m * k) / scale
+    if r > value:
+        r = ((m - 1.0) * k) / scale
+    return r
+
+
+@njit(cache=True, inline="always")
+def is_order_valid_nb(price: float, qty: float, min_notional: float, min_qty: float) -> bool:
+    """
+    Equivalente float64 de `is_order_valid` (sin mínimo = 0.0), compilable con Numba.
+    minNotional con holgura de unos ULPs: el producto float de dos decimales cortos puede
+    quedar justo por debajo del producto decimal exacto (p. ej. == mínimo).
+    """
+    return qty >= min_qty and price * qty >= min_notional * _NOTIONAL_TOL
+
+
+@njit(cache=True, inline="always")
+def apply_exchange_rules_nb(
+    price: float,
+    qty: float,
+    tick_k: float,
+    tick_scale: float,
+    step_k: float,
+    step_scale: float,
+    min_qty: float,
+    min_notional: float,
+) -> tuple[float, float, bool]:
+    """
+    `apply_exchange_rules` sobre floats planos (`SymbolRules.f64_units` desempaquetado),
+    para llamarlo desde kernels Numba. Devuelve `(price_r, qty_r, ok)`.
+    """
+    p = _floor_to_step_f64(price, tick_k, tick_scale)
+    q = _floor_to_step_f64(qty, step_k, step_scale)
+    return p, q, is_order_valid_nb(p, q, min_notional, min_qty)
+
+
+def _floor_to_step_array(values: np.ndarray, k: float, scale: float) -> np.ndarray:
+    """Versión vectorizada de `_floor_to_step_f64` (mismo algoritmo, elemento a elemento)."""
+    if k <= 0.0:
+        return values
+    m = np.floor(values * scale / k + 0.5)
+    r = (m * k) / scale
+    return np.where(r > values, ((m - 1.0) * k) / scale, r)
 
 
 def round_price(price: float | Decimal, tick_size: Decimal) -> Decimal:
@@ -130,6 +378,24 @@ def round_qty(qty: float | Decimal, step_size: Decimal) -> Decimal:
     return _floor_to_step(_dec(qty), step_size)
 
 
+def round_price_fast(price: float, rules: SymbolRules) -> float:
+    """
+    `round_price` en float64 para bucles por barra: mismo resultado que
+    `float(round_price(price, rules.tick_size))`, sin crear `Decimal`.
+
+    No es `math.floor(price / tick) * tick`: esa fórmula falla cuando `price` ya es un
+    múltiplo cuya división float queda justo por debajo del entero (ver `_floor_to_step_f64`).
+    """
+    tick_k, tick_scale = rules.f64_units[0], rules.f64_units[1]
+    return _floor_to_step_f64(price, tick_k, tick_scale)
+
+
+def round_qty_fast(qty: float, rules: SymbolRules) -> float:
+    """`round_qty` en float64 (ver `round_price_fast`)."""
+    step_k, step_scale = rules.f64_units[2], rules.f64_units[3]
+    return _floor_to_step_f64(qty, step_k, step_scale)
+
+
 def is_order_valid(
     price: Decimal,
     qty: Decimal,
@@ -155,10 +421,23 @@ def is_order_valid(
 # ======================================================================================
 
 
-def _parse_symbol_rules_from_exchange_info(symbol: str, ex_info: dict[str, Any]) -> SymbolRules:
+def _index_exchange_info(ex_info: Mapping[str, Any]) -> dict[str, dict[str, Any]]:
+    """Índice `{symbol: syminfo}` de una respuesta `exchangeInfo` (una sola pasada)."""
+    return {s["symbol"]: s for s in ex_info.get("symbols", [])}
+
+
+def _parse_symbol_rules_from_exchange_info(
+    symbol: str,
+    ex_info: Mapping[str, Any],
+    index: Mapping[str, dict[str, Any]] | None = None,
+) -> SymbolRules:
     """
     Extrae tickSize, stepSize, minQty, maxQty y minNotional de la respuesta `exchangeInfo`.
 
+    Con `index` (de `_index_exchange_info`) la entrada del símbolo es un lookup O(1); sin
+    él se recorre `ex_info["symbols"]` hasta encontrarla. Para varios símbolos de la misma
+    respuesta usar `parse_many`, que arma el índice una sola vez.
+
     Estructura típica:
     {
       "symbols": [
@@ -176,54 +455,25 @@ def _parse_symbol_rules_from_exchange_info(symbol: str, ex_info: dict[str, Any])
     }
     """
     # 1) Buscar la entrada del símbolo
-    syminfo = None
-    for s in ex_info.get("symbols", []):
-        if s.get("symbol") == symbol:
-            syminfo = s
-            break
+    if index is not None:
+        syminfo = index.get(symbol)
+    else:
+        syminfo = next((s for s in ex_info.get("symbols", []) if s.get("symbol") == symbol), None)
     if syminfo is None:
         raise ValueError(f"Símbolo {symbol} no encontrado en exchangeInfo")
 
     # 2) Extraer filtros
-    tick_size: Decimal | None = None
-    step_size: Decimal | None = None
-    min_qty: Decimal | None = None
-    max_qty: Decimal | None = None
-    min_notional: Decimal | None = None
-
-    filters = syminfo.get("filters", [])
-    raw_filters = {f.get("filterType"): f for f in filters}
-
-    for f in filters:
-        ftype = f.get("filterType")
-        if ftype == "PRICE_FILTER":
-            tick_size = _dec(f["tickSize"])
-        elif ftype in ("LOT_SIZE", "MARKET_LOT_SIZE"):
-            step_size = _dec(f["stepSize"])
-            if "minQty" in f:
-                min_qty = _dec(f["minQty"])
-            if "maxQty" in f:
-                max_qty = _dec(f["maxQty"])
-        elif ftype in ("NOTIONAL", "MIN_NOTIONAL"):
-            if "minNotional" in f:
-                min_notional = _dec(f["minNotional"])
-
-    if tick_size is None or step_size is None:
-        msg = (
-            f"Faltan PRICE_FILTER/LOT_SIZE para {symbol}: "
-            f"tick_size={tick_size}, step_size={step_size}"
-        )
-        raise ValueError(msg)
-
-    return SymbolRules(
-        symbol=symbol,
-        tick_size=tick_size,
-        step_size=step_size,
-        min_qty=min_qty,
-        max_qty=max_qty,
-        min_notional=min_notional,
-        raw_filters=raw_filters,
-    )
+    return SymbolRules.derive_from_filters(symbol, syminfo.get("filters", []))
+
+
+def parse_many(ex_info: Mapping[str, Any], symbols: Iterable[str]) -> dict[str, SymbolRules]:
+    """
+    Parsea varios símbolos de una misma respuesta `exchangeInfo` (p. ej. la del exchange
+    completo), indexándola una sola vez: O(N + len(symbols)) en vez de un recorrido de
+    la lista de símbolos por cada uno.
+    """
+    index = _index_exchange_info(ex_info)
+    return {sym: _parse_symbol_rules_from_exchange_info(sym, ex_info, index) for sym in symbols}
 
 
 # ======================================================================================
@@ -231,23 +481,204 @@ def _parse_symbol_rules_from_exchange_info(symbol: str, ex_info: dict[str, Any])
 # ======================================================================================
 
 
-def fetch_symbol_rules(symbol: str, testnet: bool) -> SymbolRules:
+def fetch_symbol_rules(
+    symbol: str,
+    testnet: bool,
+    index: Mapping[str, dict[str, Any]] | None = None,
+) -> SymbolRules:
     """
     Descarga `exchangeInfo` de Binance y lo parsea a `SymbolRules`.
     Usa el mismo entorno (testnet/mainnet) que el resto del proyecto.
+
+    Con `index` (`_index_exchange_info` de una respuesta ya descargada) no se llama a la
+    API: se parsea directamente la entrada del símbolo (cargas por lotes).
     """
+    if index is not None:
+        return _parse_symbol_rules_from_exchange_info(symbol, {}, index)
+    # Import diferido: binance-connector (requests, urllib3...) solo se carga si hay que
+    # descargar; leer reglas de la cache no lo necesita.
+    from .binance_client import BinanceClient
+
     client = BinanceClient(testnet=testnet)
     # En binance-connector moderno, `Spot.exchange_info` acepta symbol=...
     ex_info = client.exchange_info(symbol=symbol)
     return _parse_symbol_rules_from_exchange_info(symbol, ex_info)
 
 
+def fetch_symbols_rules(symbols: Iterable[str], testnet: bool) -> dict[str, SymbolRules]:
+    """
+    Como `fetch_symbol_rules` para varios símbolos, con **una sola** llamada a
+    `exchangeInfo(symbols=[...])` en lugar de una petición HTTP por símbolo.
+    """
+    symbols = list(symbols)
+    if not symbols:
+        return {}
+    from .binance_client import BinanceClient  # import diferido (ver fetch_symbol_rules)
+
+    ex_info = BinanceClient(testnet=testnet).exchange_info(symbols=symbols)
+    return parse_many(ex_info, symbols)
+
+
+def _fetch_rules_parallel(
+    symbols: list[str], testnet: bool, max_workers: int
+) -> dict[str, SymbolRules]:
+    """
+    Una petición `fetch_symbol_rules` por símbolo, repartidas en un pool de hilos acotado
+    (el tiempo es I/O de red: el GIL se libera en el socket). Tarda ~max(latencia) en
+    lugar de la suma.
+    """
+    workers = max(1, min(max_workers, len(symbols)))
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        fetched = ex.map(lambda sym: fetch_symbol_rules(sym, testnet), symbols)
+        return dict(zip(symbols, fetched, strict=True))
+
+
+# Diccionario zstd entrenado con caches de reglas (opcional, junto a las caches). Los JSON
+# de reglas son pequeños y casi idénticos entre símbolos: con diccionario comprimen mucho
+# mejor que solos. Sin él se usa zstd sin diccionario.
+_ZSTD_DICT_NAME = "_dict.zstd"
+
+
+def _require_zstd() -> ModuleType:
+    """Devuelve el módulo zstandard o falla con un mensaje claro si no está instalado."""
+    if zstd is None:
+        raise RuntimeError(
+            "zstandard no está instalado y la cache es .zst. Ejecuta: pip install 'volmicro[zstd]'"
+        )
+    return zstd
+
+
+@functools.lru_cache(maxsize=8)
+def _zstd_dict(rules_dir: Path) -> Any:
+    """Carga (una vez por directorio) `rules_dir/_dict.zstd`, o None si no existe."""
+    path = rules_dir / _ZSTD_DICT_NAME
+    return _require_zstd().ZstdCompressionDict(path.read_bytes()) if path.exists() else None
+
+
+def _read_mapped(path: Path, loads: Callable[[Any], Any]) -> Any:
+    """
+    Aplica `loads` (orjson.loads, pickle.loads, un descompresor zstd...) sobre el fichero
+    mapeado en memoria (`mmap`), sin copiarlo antes a un `bytes`. Si no se puede mapear
+    (fichero vacío, plataforma/FS sin mmap) se lee con `read_bytes()`.
+    """
+    try:
+        with open(path, "rb") as fh:  # el mapeo sigue válido tras cerrar el fichero
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return loads(path.read_bytes())
+    with mm, memoryview(mm) as view:
+        return loads(view)
+
+
+def _read_json(path: Path) -> Any:
+    """
+    Lee un JSON de disco con orjson si está instalado (stdlib json si no). Los `.zst`
+    se descomprimen antes (con el diccionario del directorio si lo hay). orjson y zstd
+    leen directamente del fichero mapeado (`_read_mapped`); json de la stdlib necesita `bytes`.
+    """
+    if path.suffix == ".zst":
+        dctx = _require_zstd().ZstdDecompressor(dict_data=_zstd_dict(path.parent))
+        raw = _read_mapped(path, dctx.decompress)
+    elif orjson is not None:
+        return _read_mapped(path, orjson.loads)
+    else:
+        raw = path.read_bytes()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """
+    Escribe `data` como JSON con orjson o stdlib json: indentado (2 espacios) en `.json`;
+    compacto y comprimido con zstd en `.zst`.
+    """
+    if path.suffix == ".zst":
+        raw = orjson.dumps(data) if orjson is not None else json.dumps(data).encode()
+        comp = _require_zstd().ZstdCompressor(dict_data=_zstd_dict(path.parent))
+        path.write_bytes(comp.compress(raw))
+    elif orjson is not None:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+# Directorio de la cache de reglas, resuelto una vez (se crea al escribir la primera cache).
+_RULES_DIR: Path = Path(settings.RULES_DIR)
+
+
 def _rules_cache_path(symbol: str) -> Path:
     """
-    Devuelve la ruta de la cache JSON para el símbolo, dentro de settings.RULES_DIR.
-    Ej.: rules/BTCUSDT_rules.json
+    Devuelve la ruta de la cache para el símbolo, dentro de `_RULES_DIR`.
+    Ej.: rules/BTCUSDT_rules.pkl
+    """
+    return _RULES_DIR / f"{symbol}_rules.pkl"
+
+
+def _existing_rules_cache(symbol: str) -> Path | None:
+    """
+    Cache existente del símbolo: el pickle de `_rules_cache_path` o, si no está, una cache
+    JSON anterior (`.json.zst` con zstandard, `.json`). None si no hay ninguna.
+    """
+    path = _rules_cache_path(symbol)
+    if path.exists():
+        return path
+    plain = _RULES_DIR / f"{symbol}_rules.json"
+    candidates = (plain.with_name(plain.name + ".zst"), plain) if zstd is not None else (plain,)
+    return next((p for p in candidates if p.exists()), None)
+
+
+def _read_rules(path: Path) -> SymbolRules:
+    """
+    Lee una cache de reglas. El formato es nuestro (no un contrato externo): `.pkl` es el
+    `SymbolRules` picklado tal cual, sin parseo JSON ni reconstrucción de `Decimal`. Un
+    pickle con un dict (formato `to_json`) o una cache `.json[.zst]` pasan por `from_json`.
+    Solo se leen ficheros que escribe este módulo en `_RULES_DIR`.
+    """
+    if path.suffix == ".pkl":
+        data = _read_mapped(path, pickle.loads)
+        return data if isinstance(data, SymbolRules) else SymbolRules.from_json(data)
+    return SymbolRules.from_json(_read_json(path))
+
+
+def _write_rules(path: Path, rules: SymbolRules) -> None:
+    """
+    Escribe la cache de `rules` en `path`: pickle en `.pkl`, JSON (`to_json`) si no. Los
+    `raw_filters` solo se guardan con `settings.INCLUDE_RAW_FILTERS_IN_CACHE`.
+    """
+    include_raw = settings.INCLUDE_RAW_FILTERS_IN_CACHE
+    if path.suffix == ".pkl":
+        data = rules if include_raw else replace(rules, raw_filters=())
+        path.write_bytes(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+    else:
+        _write_json(path, rules.to_json(include_raw_filters=include_raw))
+
+
+def _load_symbol_rules_uncached(
+    symbol: str,
+    testnet: bool,
+    use_cache: bool,
+    refresh: bool,
+) -> SymbolRules:
+    """Lee la cache o descarga y la reescribe; sin memoización (ver `load_symbol_rules`)."""
+    if use_cache and not refresh:
+        cache_path = _existing_rules_cache(symbol)
+        if cache_path is not None:
+            return _read_rules(cache_path)
+
+    rules = fetch_symbol_rules(symbol, testnet=testnet)
+    settings.ensure_dir(_RULES_DIR)
+    _write_rules(_rules_cache_path(symbol), rules)
+    return rules
+
+
+@functools.lru_cache(maxsize=256)
+def _cached_rules(symbol: str, testnet: bool, rules_dir: Path) -> SymbolRules:
+    """
+    Memo en proceso de `load_symbol_rules` con cache: la segunda petición del mismo
+    símbolo es un lookup en dict, sin syscalls ni parseo JSON/`Decimal`. `rules_dir`
+    (= `_RULES_DIR`) solo forma parte de la clave, para no servir reglas de
+    otro directorio de cache. `SymbolRules` es inmutable: compartir la instancia es seguro.
     """
-    return Path(settings.RULES_DIR) / f"{symbol}_rules.json"
+    return _load_symbol_rules_uncached(symbol, testnet, use_cache=True, refresh=False)
 
 
 def load_symbol_rules(
@@ -259,27 +690,63 @@ def load_symbol_rules(
     """
     Carga reglas desde cache (si existe y `use_cache=True`) o las descarga de Binance.
 
-    - use_cache=True: prioriza leer rules/<symbol>_rules.json si existe.
+    - use_cache=True: prioriza leer rules/<symbol>_rules.pkl (o una cache JSON) si existe.
     - refresh=True  : ignora cache, fuerza descarga y sobrescribe.
 
     Flujo:
-      1) Si hay cache válida y no pedimos refresh => cargar y devolver.
-      2) Si no, llamar `fetch_symbol_rules(...)`, guardar en cache y devolver.
+      1) Si hay cache válida y no pedimos refresh => cargar y devolver. El resultado se
+         memoiza en el proceso (`_cached_rules`): llamadas repetidas no tocan disco.
+      2) Si no, llamar `fetch_symbol_rules(...)`, guardar en cache y devolver; la memo
+         se invalida (`_cached_rules.cache_clear()`) porque la cache en disco ha cambiado.
     """
-    cache_path = _rules_cache_path(symbol)
-
-    if use_cache and cache_path.exists() and not refresh:
-        with open(cache_path) as f:
-            data = json.load(f)
-        return SymbolRules.from_json(data)
+    if use_cache and not refresh:
+        return _cached_rules(symbol, testnet, _RULES_DIR)
 
-    rules = fetch_symbol_rules(symbol, testnet=testnet)
-    cache_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(cache_path, "w") as f:
-        json.dump(rules.to_json(), f, indent=4)
+    rules = _load_symbol_rules_uncached(symbol, testnet, use_cache, refresh)
+    _cached_rules.cache_clear()
     return rules
 
 
+def load_symbols_rules(
+    symbols: Iterable[str],
+    testnet: bool,
+    use_cache: bool = True,
+    refresh: bool = False,
+    max_workers: int = 8,
+) -> dict[str, SymbolRules]:
+    """
+    `load_symbol_rules` para varios símbolos: los que tienen cache en disco se leen como
+    siempre (memoizados) y todos los que faltan se descargan juntos con
+    `fetch_symbols_rules` (una sola petición), escribiendo sus caches después.
+
+    Si la petición por lotes no es usable (falla o el endpoint no admite `symbols`), los
+    que faltan se piden uno a uno en paralelo (`max_workers` hilos).
+
+    Devuelve `{symbol: SymbolRules}` en el orden pedido (sin duplicados).
+    """
+    symbols = list(dict.fromkeys(symbols))
+    out: dict[str, SymbolRules] = {}
+    missing: list[str] = []
+    for sym in symbols:
+        if use_cache and not refresh and _existing_rules_cache(sym) is not None:
+            out[sym] = _cached_rules(sym, testnet, _RULES_DIR)
+        else:
+            missing.append(sym)
+
+    if missing:
+        try:
+            fetched = fetch_symbols_rules(missing, testnet)
+        except Exception:
+            fetched = _fetch_rules_parallel(missing, testnet, max_workers)
+        settings.ensure_dir(_RULES_DIR)
+        for sym, rules in fetched.items():
+            _write_rules(_rules_cache_path(sym), rules)
+        _cached_rules.cache_clear()  # las caches en disco han cambiado
+        out.update(fetched)
+
+    return {sym: out[sym] for sym in symbols}
+
+
 # ======================================================================================
 # Helper de integración: aplicar reglas a (price, qty)
 # ======================================================================================
@@ -296,6 +763,45 @@ def apply_exchange_rules(
     Devuelve:
       (price_rounded: Decimal, qty_rounded: Decimal, is_valid: bool)
     """
-    p = round_price(price, rules.tick_size)
-    q = round_qty(qty, rules.step_size)
-    return p, q, is_order_valid(p, q, rules.min_notional, rules.min_qty)
+    tick, step, min_qty, min_notional = rules._pack
+    p = _floor_to_step(_dec(price), tick)  # = round_price(price, tick)
+    q = _floor_to_step(_dec(qty), step)  # = round_qty(qty, step)
+    return p, q, is_order_valid(p, q, min_notional, min_qty)
+
+
+def apply_exchange_rules_f64(
+    price: float,
+    qty: float,
+    rules: SymbolRules,
+) -> tuple[float, float, bool]:
+    """
+    Igual que `apply_exchange_rules` pero en float64 y sin crear `Decimal`: envoltorio
+    de `apply_exchange_rules_nb` con `rules.f64_units`. Es el que usa `Portfolio` en
+    cada orden cuando no hay Numba.
+
+    Devuelve:
+      (price_rounded: float, qty_rounded: float, is_valid: bool)
+    """
+    return apply_exchange_rules_nb(price, qty, *rules.f64_units)
+
+
+def apply_exchange_rules_batch(
+    prices: np.ndarray,
+    qtys: np.ndarray,
+    rules: SymbolRules,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    `apply_exchange_rules_f64` para arrays (p. ej. una serie de órdenes por barra): una
+    pasada NumPy sin `Decimal`, mismo resultado elemento a elemento.
+
+    Usa el floor exacto `_floor_to_step_array` (no `np.floor(x / tick) * tick`, que se
+    equivoca en múltiplos exactos) y la misma holgura de minNotional.
+
+    Devuelve:
+      (prices_rounded: ndarray, qtys_rounded: ndarray, is_valid: ndarray[bool])
+    """
+    tick_k, tick_scale, step_k, step_scale, min_qty, min_notional = rules.f64_units
+    p = _floor_to_step_array(np.asarray(prices, dtype=np.float64), tick_k, tick_scale)
+    q = _floor_to_step_array(np.asarray(qtys, dtype=np.float64), step_k, step_scale)
+    ok = (q >= min_qty) & (p * q >= min_notional * _NOTIONAL_TOL)
+    return p, q, ok
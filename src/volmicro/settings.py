@@ -10,17 +10,20 @@ Objetivos clave:
         (<SYMBOL>_<STRATEGY>_<YYYY-MM-DD>_runXX).
 - Exponer flags para métricas y slippage.
 - Añadir validaciones ligeras (intervalos válidos, límites, rangos) para evitar fallos silenciosos.
+- Reunir lo que sale del entorno en un `Settings` inmutable (`settings.settings`), leído una
+  vez al importar; los nombres del módulo (`SYMBOL`, `LIMIT`...) se mantienen como alias.
 
 Decisiones:
 - Se fuerzan ciertos parámetros a rangos razonables (p.ej., LIMIT en [1,1000], ALLOC_PCT en [0,1]).
 - Se usa UTC en el nombre de las carpetas de reportes para consistencia entre zonas horarias.
-- Se crea reports/ y rules/ bajo demanda (o al importar, según prefieras).
+- reports/ y rules/ se crean bajo demanda (`reports_dir()` / `rules_dir()`), no al importar:
+  los entry points que no escriben nada no pagan los `mkdir`.
 """
 
+import functools
 import os
-import re
-from collections.abc import Iterable
-from datetime import datetime
+import time
+from dataclasses import dataclass
 from pathlib import Path
 
 
@@ -60,58 +63,120 @@ def _b(name: str, default: bool) -> bool:
 
 
 # ---------------------------
-# Config principal del backtest
+# Config del backtest (variables de entorno)
 # ---------------------------
 
-# Símbolo del instrumento (ej. "BTCUSDT"); lo normalizamos a mayúsculas para coherencia.
-SYMBOL = os.getenv("SYMBOL", "BTCUSDT").upper()
-
 # Intervalos válidos de Binance (puedes ampliar si activas otros en tu feed).
-_VALID_INTERVALS: set[str] = {
-    "1s",
-    "1m",
-    "3m",
-    "5m",
-    "15m",
-    "30m",
-    "1h",
-    "2h",
-    "4h",
-    "6h",
-    "8h",
-    "12h",
-    "1d",
-    "3d",
-    "1w",
-    "1M",
-}
-# Si el usuario define un intervalo inválido, hacemos fallback a "1h" para no romper la descarga.
-_INTER = os.getenv("INTERVAL", "1h")
-INTERVAL = _INTER if _INTER in _VALID_INTERVALS else "1h"
-
-# Límite de klines a pedir; acotamos a [1, 1000] que es el máximo típico.
-_LIMIT_RAW = _i("LIMIT", 200)
-LIMIT = max(1, min(1000, _LIMIT_RAW))
-
-# Modo red/testnet por defecto en True (más seguro para pruebas).
-TESTNET = _b("TESTNET", True)
-
-# Coste explícito (comisión) en basis points (bps):
-# 1 bp = 0.01%; 100 bps = 1%. Forzamos a no-negativo.
-_FEE_BPS = _f("FEE_BPS", 1.0)
-FEE_BPS = max(0.0, _FEE_BPS)
-
-# Tamaño de orden como proporción del cash disponible.
-# Se fuerza a [0,1] para evitar valores imposibles.
-_ALLOC = _f("ALLOC_PCT", 0.10)
-ALLOC_PCT = min(1.0, max(0.0, _ALLOC))
-
-# Si el realized PnL en el ledger ya viene neto de fees (afecta al reporting).
-REALIZED_NET_FEES = _b("REALIZED_NET_FEES", False)
+_VALID_INTERVALS: frozenset[str] = frozenset(
+    {
+        "1s",
+        "1m",
+        "3m",
+        "5m",
+        "15m",
+        "30m",
+        "1h",
+        "2h",
+        "4h",
+        "6h",
+        "8h",
+        "12h",
+        "1d",
+        "3d",
+        "1w",
+        "1M",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """
+    Parámetros leídos del entorno, validados una sola vez (`Settings.from_env()`) y
+    congelados: los lectores ven una foto inmutable y pueden enlazar la instancia entera
+    en una variable local. Los nombres del módulo (`settings.SYMBOL`, ...) son alias de
+    los campos de `settings` (la instancia de este módulo).
+    """
 
-# Frecuencia de logging del motor (cada cuántas barras loguear en nivel INFO).
-# 0 => desactiva logs intermedios (solo el primero y eventos clave).
-LOG_EVERY = max(0, _i("LOG_EVERY", 10))
+    # Símbolo del instrumento (ej. "BTCUSDT"), en mayúsculas.
+    SYMBOL: str
+    # Intervalo de klines; uno inválido cae a "1h" para no romper la descarga.
+    INTERVAL: str
+    # Límite de klines a pedir, acotado a [1, 1000] (el máximo típico).
+    LIMIT: int
+    # Modo red/testnet (por defecto True: más seguro para pruebas).
+    TESTNET: bool
+    # Comisión en basis points (1 bp = 0.01%; 100 bps = 1%), no negativa.
+    FEE_BPS: float
+    # Tamaño de orden como proporción del cash disponible, en [0, 1].
+    ALLOC_PCT: float
+    # Si el realized PnL en el ledger ya viene neto de fees (afecta al reporting).
+    REALIZED_NET_FEES: bool
+    # Cada cuántas barras loguear en nivel INFO; 0 => sin logs intermedios (solo el
+    # primero y eventos clave).
+    LOG_EVERY: int
+    # Métricas: True => retornos diarios (resample 1D) para vol/Sharpe/anualización;
+    # False => retornos por barra (frecuencia original de tus datos).
+    METRICS_USE_DAILY: bool
+    # Días para anualizar (252 ≈ sesiones bursátiles; 365 ≈ días naturales), >= 1.
+    METRICS_ANNUALIZATION_DAYS: int
+    # Slippage en bps sobre el precio de referencia, no negativo:
+    # BUY => price * (1 + bps/10_000); SELL => price * (1 - bps/10_000).
+    SLIPPAGE_BPS: float
+    # Si False, Portfolio no registra los metadatos de ejecución por trade (slippage,
+    # redondeos, reglas, run_id...): esas columnas quedan vacías en trades_dataframe().
+    # Útil en runs que solo miran la equity.
+    TRADES_RECORD_META: bool
+    # Reglas de Binance: leer la cache local rules/<SYMBOL>_rules.pkl si existe...
+    RULES_USE_CACHE: bool
+    # ... o ignorarla y refrescar desde Binance.
+    RULES_REFRESH: bool
+    # Guardar también los filtros crudos (`raw_filters`, solo debugging/auditoría) en la
+    # cache. Por defecto se omiten: la cache ocupa menos y se lee más rápido.
+    INCLUDE_RAW_FILTERS_IN_CACHE: bool
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Lee y valida todas las variables de entorno (con sus valores por defecto)."""
+        interval = os.getenv("INTERVAL", "1h")
+        return cls(
+            SYMBOL=os.getenv("SYMBOL", "BTCUSDT").upper(),
+            INTERVAL=interval if interval in _VALID_INTERVALS else "1h",
+            LIMIT=max(1, min(1000, _i("LIMIT", 200))),
+            TESTNET=_b("TESTNET", True),
+            FEE_BPS=max(0.0, _f("FEE_BPS", 1.0)),
+            ALLOC_PCT=min(1.0, max(0.0, _f("ALLOC_PCT", 0.10))),
+            REALIZED_NET_FEES=_b("REALIZED_NET_FEES", False),
+            LOG_EVERY=max(0, _i("LOG_EVERY", 10)),
+            METRICS_USE_DAILY=_b("METRICS_USE_DAILY", True),
+            METRICS_ANNUALIZATION_DAYS=max(1, _i("METRICS_ANNUALIZATION_DAYS", 252)),
+            SLIPPAGE_BPS=max(0.0, _f("SLIPPAGE_BPS", 5.0)),
+            TRADES_RECORD_META=_b("TRADES_RECORD_META", True),
+            RULES_USE_CACHE=_b("RULES_USE_CACHE", True),
+            RULES_REFRESH=_b("RULES_REFRESH", False),
+            INCLUDE_RAW_FILTERS_IN_CACHE=_b("INCLUDE_RAW_FILTERS_IN_CACHE", False),
+        )
+
+
+# Foto de la configuración del proceso.
+settings = Settings.from_env()
+
+# Alias a nivel de módulo (compatibilidad: `from . import settings; settings.SYMBOL`).
+SYMBOL = settings.SYMBOL
+INTERVAL = settings.INTERVAL
+LIMIT = settings.LIMIT
+TESTNET = settings.TESTNET
+FEE_BPS = settings.FEE_BPS
+ALLOC_PCT = settings.ALLOC_PCT
+REALIZED_NET_FEES = settings.REALIZED_NET_FEES
+LOG_EVERY = settings.LOG_EVERY
+METRICS_USE_DAILY = settings.METRICS_USE_DAILY
+METRICS_ANNUALIZATION_DAYS = settings.METRICS_ANNUALIZATION_DAYS
+SLIPPAGE_BPS = settings.SLIPPAGE_BPS
+TRADES_RECORD_META = settings.TRADES_RECORD_META
+RULES_USE_CACHE = settings.RULES_USE_CACHE
+RULES_REFRESH = settings.RULES_REFRESH
+INCLUDE_RAW_FILTERS_IN_CACHE = settings.INCLUDE_RAW_FILTERS_IN_CACHE
 
 
 # ---------------------------
@@ -127,15 +192,30 @@ except Exception:
     # Fallback: carpeta actual si no se puede resolver (entornos raros).
     PROJECT_ROOT = Path(".").resolve()
 
-# Directorios de salida/cache a nivel de proyecto.
+# Directorios de salida/cache a nivel de proyecto (solo rutas: no se crean al importar).
 REPORTS_DIR = PROJECT_ROOT / "reports"
 RULES_DIR = PROJECT_ROOT / "rules"
 
-# Puedes crear estas carpetas al importar (comodidad DX)...
-REPORTS_DIR.mkdir(parents=True, exist_ok=True)
-RULES_DIR.mkdir(parents=True, exist_ok=True)
-# ...o comentarlas y crearlas bajo demanda desde las funciones
-# según tus preferencias.
+
+@functools.cache
+def ensure_dir(path: Path) -> Path:
+    """
+    Crea `path` (con padres) la primera vez que se pide y lo devuelve; las siguientes
+    llamadas con la misma ruta son un lookup, sin syscalls. Si se borra la carpeta a mitad
+    de proceso no se vuelve a crear.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def reports_dir() -> Path:
+    """`REPORTS_DIR`, creado bajo demanda."""
+    return ensure_dir(REPORTS_DIR)
+
+
+def rules_dir() -> Path:
+    """`RULES_DIR`, creado bajo demanda."""
+    return ensure_dir(RULES_DIR)
 
 
 # ---------------------------
@@ -143,27 +223,52 @@ RULES_DIR.mkdir(parents=True, exist_ok=True)
 # ---------------------------
 
 
-def _next_run_number(existing_dirs: Iterable[Path], prefix: str) -> int:
+# Caracteres ASCII que NO se admiten en el nombre de estrategia (todo salvo [A-Za-z0-9_-]).
+_STRATEGY_SANITIZE_TABLE: dict[int, None] = {
+    i: None for i in range(128) if not (chr(i).isalnum() or chr(i) in "_-")
+}
+
+
+def _next_run_number(root: Path, prefix: str) -> int:
     """
-    Dado un conjunto de directorios existentes y un prefijo, encuentra
-    el mayor sufijo numérico runNN y devuelve el siguiente (NN+1).
+    Dado el directorio de reports y un prefijo, encuentra el mayor sufijo numérico runNN
+    entre sus subcarpetas y devuelve el siguiente (NN+1).
     Evita “huecos” si se han borrado runs antiguos.
 
-    - existing_dirs: lista de Paths tipo ".../reports/BTCUSDT_MA_2025-10-29_run03"
-    - prefix      : "BTCUSDT_MA_2025-10-29_run"
-    """
-    pat = re.compile(rf"^{re.escape(prefix)}(\d+)$")
-    nums = []
-    for p in existing_dirs:
-        m = pat.match(p.name)
-        if m:
-            try:
-                nums.append(int(m.group(1)))
-            except ValueError:
-                pass
+    - root  : carpeta con subcarpetas tipo "BTCUSDT_MA_2025-10-29_run03"
+    - prefix: "BTCUSDT_MA_2025-10-29_run"
+
+    Recorre con `os.scandir`: el tipo de cada entrada viene del propio listado, sin un
+    `stat` ni un `Path` por carpeta.
+    """
+    k = len(prefix)
+    with os.scandir(root) as it:
+        nums = [
+            int(name[k:])
+            for e in it
+            if (name := e.name).startswith(prefix) and name[k:].isdecimal() and e.is_dir()
+        ]
     return (max(nums) + 1) if nums else 1
 
 
+# Fecha UTC formateada del día en curso, cacheada por número de día (epoch // 86400).
+_TODAY_CACHE: tuple[int, str] = (-1, "")
+
+
+def _today_utc() -> str:
+    """
+    Fecha UTC actual como "YYYY-MM-DD". Solo se formatea al cambiar de día: en barridos
+    que crean muchas carpetas seguidas el resto de llamadas devuelven la cadena cacheada.
+    """
+    global _TODAY_CACHE
+    day = int(time.time()) // 86400
+    cached_day, date_str = _TODAY_CACHE
+    if day != cached_day:
+        date_str = time.strftime("%Y-%m-%d", time.gmtime(day * 86400))
+        _TODAY_CACHE = (day, date_str)
+    return date_str
+
+
 def generate_report_dir(symbol: str, strategy_name: str) -> Path:
     """
     Crea una subcarpeta dentro de reports/ con el patrón:
@@ -177,54 +282,19 @@ def generate_report_dir(symbol: str, strategy_name: str) -> Path:
     - Se detecta el siguiente runXX continuo basado en carpetas existentes.
     """
     # Fecha en UTC para reproducibilidad (evita diferencias por TZ locales)
-    date_str = datetime.utcnow().strftime("%Y-%m-%d")
+    date_str = _today_utc()
 
     # Sanitizamos el nombre de estrategia para que sea path-safe (sin espacios o chars raros)
-    safe_strategy = re.sub(r"[^A-Za-z0-9_-]", "", strategy_name)
+    # (tabla de `str.translate` para ASCII; lo no-ASCII se descarta al codificar)
+    safe_strategy = (
+        strategy_name.translate(_STRATEGY_SANITIZE_TABLE).encode("ascii", "ignore").decode()
+    )
 
     prefix = f"{symbol}_{safe_strategy}_{date_str}_run"
-    REPORTS_DIR.mkdir(parents=True, exist_ok=True)  # creación bajo demanda
-    existing = [p for p in REPORTS_DIR.glob(f"{prefix}*") if p.is_dir()]
-
-    run_number = _next_run_number(existing, prefix)
+    root = reports_dir()  # creación bajo demanda
+    run_number = _next_run_number(root, prefix)
     folder_name = f"{prefix}{run_number:02d}"
 
-    report_dir = REPORTS_DIR / folder_name
+    report_dir = root / folder_name
     report_dir.mkdir(parents=True, exist_ok=True)
     return report_dir
-
-
-# ---------------------------
-# Métricas
-# ---------------------------
-
-# Si True, se usan retornos diarios (resample 1D) para vol/Sharpe/anualización.
-# Si False, se usan retornos por barra (frecuencia original de tus datos).
-METRICS_USE_DAILY = _b("METRICS_USE_DAILY", True)
-
-# Días para anualizar métricas. 252 ≈ sesiones bursátiles; 365 ≈ días naturales.
-# Se fuerza a >=1 para evitar divisiones por cero.
-METRICS_ANNUALIZATION_DAYS = max(1, _i("METRICS_ANNUALIZATION_DAYS", 252))
-
-
-# ---------------------------
-# Slippage (coste implícito de ejecución)
-# ---------------------------
-
-# Slippage en bps aplicado al precio de referencia:
-# - BUY  => price * (1 + bps/10_000)
-# - SELL => price * (1 - bps/10_000)
-# Se fuerza a no-negativo.
-_SLIP = _f("SLIPPAGE_BPS", 5.0)
-SLIPPAGE_BPS = max(0.0, _SLIP)
-
-
-# ---------------------------
-# Reglas de Binance (caché)
-# ---------------------------
-
-# Si True, intentará leer reglas del símbolo desde cache local rules/<SYMBOL>_rules.json
-RULES_USE_CACHE = _b("RULES_USE_CACHE", True)
-
-# Si True, ignorará la cache y refrescará desde Binance.
-RULES_REFRESH = _b("RULES_REFRESH", False)
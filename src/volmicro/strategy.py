@@ -15,10 +15,20 @@ La estrategia puede ejecutar acciones como:
 y opcionalmente tener un "hook" final `on_finish(portfolio)` para cerrar posiciones
 o hacer limpieza.
 
+Modo vectorizado (opcional): una estrategia sin estado entre barras puede declarar
+`MODE = "vectorized"` e implementar
+    vectorized_signals(closes, ts) -> (buy_idx, sell_idx)
+    on_signal(bar, side, portfolio)
+El motor calcula entonces las señales de una vez sobre los arrays de barras y solo llama
+a la estrategia en las barras con señal; `on_bar` queda para el modo por barra.
+
 En este archivo incluimos una estrategia trivial de ejemplo: **BuySecondBarStrategy**.
 """
 
 from dataclasses import dataclass, field
+from typing import ClassVar
+
+import numpy as np
 
 from .core import Bar
 from .portfolio import Portfolio
@@ -34,7 +44,8 @@ class BuySecondBarStrategy:
 
     Lógica:
     -------
-    - Lleva un contador interno de barras (`_counter`).
+    - Lleva un contador interno de barras (`_counter`) hasta la segunda; a partir de ahí
+      (segundo estado) `on_bar` solo guarda la última barra, sin contar ni comparar.
     - En la segunda barra (i == 2):
         - Calcula cuánto puede comprar (`alloc_pct` del cash disponible).
         - Ejecuta un BUY a precio de cierre de la barra.
@@ -44,10 +55,17 @@ class BuySecondBarStrategy:
 
     Esta estrategia sirve como *test funcional* del motor y de los flujos
     de ejecución (buy/sell, fees, slippage, exportaciones...).
+
+    Con `MODE = "vectorized"` el motor no llama a `on_bar`: las señales son BUY en la
+    barra de índice 1 y SELL (cierre) en la última, vía `vectorized_signals` /
+    `on_signal`, con el mismo resultado que el recorrido barra a barra.
     """
 
+    # El engine usa `vectorized_signals` / `on_signal` en lugar de `on_bar`
+    MODE: ClassVar[str] = "vectorized"
+
     # --- Atributos internos ---
-    _counter: int = field(default=0, init=False)  # contador de barras procesadas
+    _counter: int = field(default=0, init=False)  # barras procesadas (se detiene en 2)
     alloc_pct: float = 0.10  # % del cash que se asigna al comprar
     _last_bar: Bar | None = field(default=None, init=False)  # referencia a la última barra
 
@@ -65,10 +83,13 @@ class BuySecondBarStrategy:
           - Tomar decisiones: comprar, vender, mantener.
           - Anotar trades con un `note` para logging y debugging.
         """
-        # Incrementamos el contador de barras
-        self._counter += 1
         # Guardamos la última barra vista (para poder cerrar al final)
         self._last_bar = bar
+        # Segundo estado: la compra ya se decidió, el resto de barras no hace nada más
+        if self._counter >= 2:
+            return
+        # Incrementamos el contador de barras
+        self._counter += 1
 
         # --- Lógica: comprar en la segunda barra ---
         if self._counter == 2:
@@ -84,6 +105,30 @@ class BuySecondBarStrategy:
                     note="Second bar buy (alloc %)",
                 )
 
+    # ------------------------------------------------------------------------------
+    # Modo vectorizado: señales de una vez + ejecución en las barras con señal
+    # ------------------------------------------------------------------------------
+    def vectorized_signals(
+        self, closes: np.ndarray, ts: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Índices (0-based) de las barras con orden: BUY en la segunda barra y SELL en la
+        última (el cierre que en modo por barra hace `on_finish`).
+        """
+        n = len(closes)
+        buy_idx = np.array([1] if n >= 2 else [], dtype=np.int64)
+        sell_idx = np.array([n - 1] if n else [], dtype=np.int64)
+        return buy_idx, sell_idx
+
+    def on_signal(self, bar: Bar, side: str, portfolio: Portfolio) -> None:
+        """Ejecuta la orden de una señal de `vectorized_signals` (= on_bar / on_finish)."""
+        if side == "BUY":
+            qty = portfolio.affordable_qty(price=bar.close, alloc_pct=self.alloc_pct)
+            if qty > 0:
+                portfolio.buy(ts=bar.ts, qty=qty, price=bar.close, note="Second bar buy (alloc %)")
+        elif portfolio.qty > 0:
+            portfolio.sell(ts=bar.ts, qty=portfolio.qty, price=bar.close, note="Close on finish")
+
     # ------------------------------------------------------------------------------
     # on_finish: hook opcional que se ejecuta tras la última barra
     # ------------------------------------------------------------------------------
@@ -95,7 +140,12 @@ class BuySecondBarStrategy:
 
         En este caso, si aún tenemos una posición abierta, la vendemos
         al precio de cierre de la última barra.
+
+        En modo vectorizado el cierre ya es la señal SELL de la última barra
+        (`vectorized_signals` / `on_signal`), así que aquí no se hace nada.
         """
+        if self.MODE == "vectorized":
+            return
         if self._last_bar and portfolio.qty > 0:
             portfolio.sell(
                 ts=self._last_bar.ts,
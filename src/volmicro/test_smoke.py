@@ -16,6 +16,7 @@ sintéticos y no llama a `rules.load_symbol_rules`. Su propósito es detectar ro
 obvias en el wiring del sistema.
 """
 
+import numpy as np
 import pandas as pd
 
 from src.volmicro.binance_feed import iter_bars
@@ -39,14 +40,21 @@ def make_df(n: int = 10, start: float = 100.0, step: float = 1.0) -> pd.DataFram
     Índice: pd.date_range(..., tz="UTC") para cumplir con el requisito tz-aware.
     """
     idx = pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC")
+    # Columnas como arrays float64 (sin listas Python ni inferencia de dtype por columna).
+    # Un dict de arrays 1D con copy=False deja cada columna en su propio bloque contiguo
+    # (reducciones por columna sin saltos de stride). No construir el frame desde un
+    # ndarray 2D (row-major: cada columna quedaría con stride = nº de columnas); si hace
+    # falta la matriz, `df.to_numpy()` sobre este frame ya sale column-major (order="F").
+    base = start + np.arange(n, dtype=np.float64) * step
     data = {
-        "open": [start + i * step for i in range(n)],
-        "high": [start + i * step + 1 for i in range(n)],
-        "low": [start + i * step - 1 for i in range(n)],
-        "close": [start + i * step for i in range(n)],
-        "volume": [1.0] * n,
+        "open": base,
+        "high": base + 1.0,
+        "low": base - 1.0,
+        # copia: con copy=False "open" y "close" compartirían buffer (pandas 2.x sin CoW)
+        "close": base.copy(),
+        "volume": np.ones(n, dtype=np.float64),
     }
-    return pd.DataFrame(data, index=idx)
+    return pd.DataFrame(data, index=idx, copy=False)
 
 
 # ------------------------------------------------------------------------------
@@ -100,3 +108,10 @@ def test_no_trade_if_short_series():
     assert len(trades) == 0, f"No debería haber trades con 1 barra; hay {len(trades)}"
     # Equity = cash porque MTM sin posición ⇒ qty=0
     assert abs(p.equity() - p.cash) < 1e-9, "Equity debería igualar cash cuando no hay posición"
+
+
+def test_make_df_columns_are_column_major():
+    # Cada columna en su propio buffer contiguo y la matriz de `to_numpy()` en orden F
+    df = make_df(n=10)
+    assert all(df[c].to_numpy().flags.c_contiguous for c in df.columns)
+    assert df.to_numpy().flags.f_contiguous
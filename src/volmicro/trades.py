@@ -2,17 +2,18 @@
 """
 Estructura básica que representa una operación ejecutada (trade).
 
-Cada vez que el portfolio ejecuta una orden `buy()` o `sell()`, crea un objeto
-`Trade` que recoge los datos esenciales del momento de la ejecución: precio,
-cantidad, fee, PnL, etc.
-
-Los `Trade` se almacenan en `Portfolio.trades`, y luego se exportan a CSV a
-través de `Portfolio.trades_dataframe()` junto con metadatos adicionales
-(slippage, reglas de Binance, run_id, etc.).
+`Trade` recoge los datos esenciales del momento de la ejecución de un `buy()` o
+`sell()`: precio, cantidad, fee, PnL, etc.
+
+El almacén de trades es columnar (SoA): el `Portfolio` escribe esos campos
+directamente en arrays NumPy tipados, uno por columna (`side`/`symbol` como códigos
+enteros), sin crear un `Trade` por orden. `Trade` es solo una vista de fila ligera
+(`NamedTuple`) que `Portfolio.trades` reconstruye bajo demanda, columna a columna;
+`Portfolio.trades_dataframe()` entrega los arrays directamente a pandas junto con
+metadatos adicionales (slippage, reglas de Binance, run_id, etc.).
 """
 
-from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, NamedTuple
 
 import pandas as pd
 
@@ -20,10 +21,10 @@ import pandas as pd
 Side = Literal["BUY", "SELL"]
 
 
-@dataclass
-class Trade:
+class Trade(NamedTuple):
     """
-    Representa una transacción individual (compra o venta).
+    Representa una transacción individual (compra o venta). Inmutable: es una vista de
+    una fila del buffer columnar de `Portfolio`.
 
     Campos
     ------
@@ -66,8 +67,10 @@ class Trade:
     Notas
     -----
     - Esta clase **no contiene** slippage, tick/step o validaciones de exchange:
-      esos datos se guardan aparte en los metadatos paralelos (`Portfolio._trade_meta`).
-    - `Portfolio._record(trade, meta)` combina ambos mundos para la exportación.
+      esos datos son columnas de metadatos del buffer de `Portfolio`.
+    - `Portfolio._record(...)` escribe ambos (campos base + metadatos) en la misma fila.
+    - `NamedTuple` y no dataclass: construir N vistas (`Trade._make`) es mucho más barato
+      y el orden de campos coincide con el de las columnas base.
     - Los tests (`tests/test_trades_schema.py`) validan que el CSV de trades
       resultante contenga todas las columnas esperadas.
     """
@@ -0,0 +1,65 @@
+# tests/test_engine.py
+"""
+Camino vectorizado del engine: `BuySecondBarStrategy` (MODE="vectorized") debe dar los
+mismos trades y la misma equity curve que su versión barra a barra (`on_bar`), también
+con fees/slippage y con series muy cortas.
+"""
+
+from dataclasses import dataclass
+from typing import ClassVar
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.volmicro.binance_feed import iter_bars
+from src.volmicro.engine import run_engine
+from src.volmicro.portfolio import Portfolio
+from src.volmicro.strategy import BuySecondBarStrategy
+
+
+@dataclass
+class PerBarBuySecondBar(BuySecondBarStrategy):
+    MODE: ClassVar[str] = "iter"
+
+
+def make_df(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    close = 100.0 + np.cumsum(rng.normal(0, 1, n))
+    idx = pd.date_range("2025-01-01", periods=n, freq="h", tz="UTC")
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 1.0},
+        index=idx,
+    )
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 500])
+@pytest.mark.parametrize("fee_bps, slippage_bps", [(0.0, 0.0), (10.0, 5.0)])
+def test_vectorized_mode_matches_per_bar(n, fee_bps, slippage_bps):
+    results = []
+    for strat in (BuySecondBarStrategy(alloc_pct=0.3), PerBarBuySecondBar(alloc_pct=0.3)):
+        p = Portfolio(cash=10_000.0, symbol="TEST", fee_bps=fee_bps)
+        p.set_execution_rules(rules=None, slippage_bps=slippage_bps)
+        p = run_engine(iter_bars(make_df(n), symbol="TEST"), p, strat, log_every=0)
+        results.append((p.trades_dataframe(), p.equity_curve_dataframe(), p.cash))
+
+    (t_vec, e_vec, cash_vec), (t_bar, e_bar, cash_bar) = results
+    pd.testing.assert_frame_equal(t_vec, t_bar)
+    pd.testing.assert_frame_equal(e_vec, e_bar)
+    assert cash_vec == cash_bar
+    assert len(t_vec) == (2 if n >= 2 else 0)
+
+
+@pytest.mark.parametrize("level", ["INFO", "DEBUG"])
+@pytest.mark.parametrize("log_every", [0, 1, 7])
+def test_vectorized_mode_logs_same_checkpoints(caplog, level, log_every):
+    logs = []
+    for strat in (BuySecondBarStrategy(alloc_pct=0.3), PerBarBuySecondBar(alloc_pct=0.3)):
+        p = Portfolio(cash=10_000.0, symbol="TEST", fee_bps=10.0)
+        caplog.clear()
+        with caplog.at_level(level, logger="src.volmicro.engine"):
+            run_engine(iter_bars(make_df(30), symbol="TEST"), p, strat, log_every=log_every)
+        logs.append([(r.levelno, r.getMessage()) for r in caplog.records if " i=" in r.message])
+
+    vec, per_bar = logs
+    assert vec == per_bar and vec
@@ -0,0 +1,207 @@
+# tests/test_execution_model.py
+"""
+Equivalencia del kernel numérico del modelo de ejecución.
+
+Objetivo
+--------
+- El redondeo float64 de `rules` (`_floor_to_step_f64`, `apply_exchange_rules_f64`) debe
+  coincidir exactamente con la referencia `Decimal` (`apply_exchange_rules`).
+- `Portfolio._apply_execution_model` tiene dos caminos: Python (`apply_exchange_rules_f64`)
+  y kernel (`_exec_model_kernel`, compilado con Numba si está instalado). Estos tests
+  fuerzan ambos (sin Numba el kernel corre como Python puro) y verifican que producen
+  exactamente los mismos precios, cantidades y motivos.
+"""
+
+import random
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.volmicro import portfolio as portfolio_mod
+from src.volmicro.portfolio import Portfolio
+from src.volmicro.rules import (
+    SymbolRules,
+    _dec,
+    _floor_to_step,
+    _floor_to_step_f64,
+    _step_units,
+    apply_exchange_rules,
+    apply_exchange_rules_batch,
+    apply_exchange_rules_f64,
+    round_price_fast,
+    round_qty_fast,
+)
+
+STEPS = ["0.01", "0.1", "0.00001", "0.00000100", "1", "0.5", "10", "0.25"]
+
+
+def make_rules() -> SymbolRules:
+    return SymbolRules(
+        symbol="BTCUSDT",
+        tick_size=Decimal("0.01"),
+        step_size=Decimal("0.00001"),
+        min_qty=Decimal("0.00001"),
+        max_qty=Decimal("9000"),
+        min_notional=Decimal("5"),
+        raw_filters=(),
+    )
+
+
+def test_floor_to_step_f64_matches_decimal_floor():
+    rng = random.Random(7)
+    for _ in range(20_000):
+        step = Decimal(rng.choice(STEPS))
+        k, scale = _step_units(step)
+        # Mezcla de valores arbitrarios y de múltiplos "casi exactos" del step
+        value = rng.choice(
+            [rng.uniform(0, 100_000), rng.uniform(0, 1), rng.randint(1, 100_000) * float(step)]
+        )
+        expected = float(_floor_to_step(_dec(value), step))
+        assert _floor_to_step_f64(value, k, scale) == expected, (value, step)
+
+
+def test_apply_exchange_rules_f64_matches_decimal():
+    rng = random.Random(5)
+    rules = make_rules()
+    for _ in range(20_000):
+        price = rng.uniform(1_000, 60_000)
+        qty = rng.choice([rng.uniform(0, 0.5), rng.uniform(0, 1e-3), 5 / price])
+        p_dec, q_dec, ok = apply_exchange_rules(price, qty, rules)
+        assert apply_exchange_rules_f64(price, qty, rules) == (float(p_dec), float(q_dec), ok)
+        assert (round_price_fast(price, rules), round_qty_fast(qty, rules)) == (
+            float(p_dec),
+            float(q_dec),
+        )
+
+
+def test_apply_exchange_rules_batch_matches_scalar():
+    rng = np.random.default_rng(7)
+    rules = make_rules()
+    prices = rng.uniform(1_000, 60_000, 5_000)
+    qtys = np.concatenate([rng.uniform(0, 0.5, 2_500), 5 / prices[2_500:]])
+    p, q, ok = apply_exchange_rules_batch(prices, qtys, rules)
+    for i in range(len(prices)):
+        assert (p[i], q[i], ok[i]) == apply_exchange_rules_f64(prices[i], qtys[i], rules)
+
+
+@pytest.mark.parametrize("with_rules", [True, False])
+def test_kernel_path_matches_reference(monkeypatch, with_rules):
+    rng = random.Random(11)
+    p = Portfolio(cash=10_000.0, fee_bps=10.0)
+    p.set_execution_rules(rules=make_rules() if with_rules else None, slippage_bps=5.0)
+
+    for _ in range(2_000):
+        side = rng.choice(["BUY", "SELL"])
+        price = rng.uniform(1_000, 60_000)
+        qty = rng.choice([rng.uniform(0, 0.5), rng.uniform(0, 1e-4), 1e3])
+
+        monkeypatch.setattr(portfolio_mod, "NUMBA_AVAILABLE", False)
+        ref = p._apply_execution_model(side=side, ref_price=price, qty_raw=qty)
+        monkeypatch.setattr(portfolio_mod, "NUMBA_AVAILABLE", True)
+        got = p._apply_execution_model(side=side, ref_price=price, qty_raw=qty)
+
+        assert got == ref
+
+
+@pytest.mark.parametrize("with_rules", [True, False])
+def test_batch_matches_single_order(with_rules):
+    rng = random.Random(13)
+    p = Portfolio(cash=1e12, fee_bps=10.0)
+    p.set_execution_rules(rules=make_rules() if with_rules else None, slippage_bps=5.0)
+
+    sides = [rng.choice(["BUY", "SELL"]) for _ in range(2_000)]
+    prices = [rng.choice([rng.uniform(1_000, 60_000), 0.0]) for _ in sides]
+    qtys = [rng.choice([rng.uniform(0, 0.5), rng.uniform(0, 1e-4), -1.0]) for _ in sides]
+
+    batch = p._apply_execution_model_batch(
+        np.array([s == "BUY" for s in sides]), np.array(prices), np.array(qtys)
+    )
+    assert len(batch) == len(sides)
+    for i, (side, price, qty) in enumerate(zip(sides, prices, qtys, strict=True)):
+        ref = p._apply_execution_model(side=side, ref_price=price, qty_raw=qty)
+        assert batch.preview(i) == ref
+
+
+def test_batch_consumes_cash_in_order():
+    p = Portfolio(cash=1_000.0, fee_bps=0.0)
+    p.set_execution_rules(rules=None, slippage_bps=0.0)
+    batch = p._apply_execution_model_batch(
+        np.array([True, False, True, True]),
+        np.array([100.0, 100.0, 100.0, 100.0]),
+        np.array([6.0, 50.0, 4.0, 1.0]),
+    )
+    # 600 + 400 cabe justo; la siguiente compra (100) ya no
+    assert batch.valid.tolist() == [True, True, True, False]
+    assert batch.preview(3).reason == "cash insuficiente (notional + fee)"
+
+
+def test_sell_clamps_to_position_unless_strict():
+    p = Portfolio(cash=1_000.0, fee_bps=0.0)
+    p.set_execution_rules(rules=None, slippage_bps=0.0)
+    p.buy(pd.Timestamp("2024-01-01", tz="UTC"), 2.0, 100.0)
+    with pytest.raises(ValueError):
+        p.sell(pd.Timestamp("2024-01-02", tz="UTC"), 3.0, 100.0, strict=True)
+
+    p.sell(pd.Timestamp("2024-01-02", tz="UTC"), 3.0, 100.0)
+    assert p.qty == 0.0
+    assert p.trades[-1].qty == 2.0
+    assert p.cash == 1_000.0
+
+
+def test_trades_views_match_dataframe():
+    p = Portfolio(cash=1_000.0, fee_bps=10.0)
+    p.buy(pd.Timestamp("2024-01-01", tz="UTC"), 2.0, 100.0, note="entry")
+    p.sell(pd.Timestamp("2024-01-02", tz="UTC"), 1.0, 110.0)
+
+    df = p.trades_dataframe()
+    trades = p.trades
+    assert [t.side for t in trades] == df["side"].astype(str).tolist()
+    assert [t.note for t in trades] == ["entry", ""]
+    for col in ("qty", "price", "fee", "cash_after", "equity_after", "cum_realized_pnl"):
+        assert [getattr(t, col) for t in trades] == df[col].tolist()
+
+
+def test_fast_path_matches_execution_model():
+    ts = pd.date_range("2024-01-01", periods=6, freq="h", tz="UTC")
+    runs = []
+    for fast in (True, False):
+        p = Portfolio(cash=1_000.0, fee_bps=0.0)
+        p.set_execution_rules(rules=None, slippage_bps=0.0)
+        assert p._fast_path
+        p._fast_path = fast
+        p.buy(ts[0], 3.0, 100.0)
+        p.buy(ts[1], 50.0, 110.0)  # sin cash: se omite
+        p.buy(ts[2], 1.0, 0.0)  # precio no válido: se omite
+        p.sell(ts[3], 2.5, 120.0)
+        p.buy(ts[4], 1.25, 90.0)
+        p.sell(ts[5], 10.0, 95.0)
+        runs.append(p)
+    fast, ref = runs
+    pd.testing.assert_frame_equal(fast.trades_dataframe(), ref.trades_dataframe())
+    assert (fast.cash, fast.qty, fast.realized_pnl) == (ref.cash, ref.qty, ref.realized_pnl)
+
+
+def test_record_previews_matches_execution_model():
+    p = Portfolio(cash=1_000.0, fee_bps=10.0, record_previews=True)
+    p.set_execution_rules(rules=make_rules(), slippage_bps=5.0)
+    orders = [("BUY", 30_000.0, 0.02), ("BUY", 30_000.0, 1.0), ("SELL", 31_000.0, 0.02)]
+    expected = []
+    for side, price, qty in orders:
+        expected.append(p._apply_execution_model(side=side, ref_price=price, qty_raw=qty))
+        ts = pd.Timestamp("2024-01-01", tz="UTC")
+        (p.buy if side == "BUY" else p.sell)(ts, qty, price)
+    assert p.previews == expected
+    assert [pv.valid for pv in p.previews] == [True, False, True]
+    assert Portfolio().previews == []
+
+
+def test_symbol_rules_raw_filters_roundtrip():
+    filters = {
+        "PRICE_FILTER": {"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+        "LOT_SIZE": {"filterType": "LOT_SIZE", "stepSize": "0.00001", "minQty": "0.00001"},
+    }
+    rules = SymbolRules.from_json({**make_rules().to_json(), "raw_filters": filters})
+    assert rules.to_json()["raw_filters"] == filters
+    assert hash(rules) == hash(SymbolRules.from_json(rules.to_json()))
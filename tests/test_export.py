@@ -0,0 +1,101 @@
+# tests/test_export.py
+"""
+Exportación de trades / equity curve desde el buffer columnar de `Portfolio`.
+
+- CSV: siempre disponible, mismo contenido que `trades_dataframe()`.
+- Parquet: solo si pyarrow está instalado (extra `parquet`); se comprueba que la tabla
+  releída coincide con `trades_dataframe()`.
+- `trades_dataframe()` se cachea hasta el siguiente trade; lo devuelto se puede modificar.
+- Los metadatos constantes del run se difunden por tramos: respetan cambios de reglas a
+  mitad de run y las filas registradas sin metadatos.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.volmicro.portfolio import Portfolio
+
+
+def make_portfolio() -> Portfolio:
+    p = Portfolio(cash=10_000.0, fee_bps=10.0, run_id="test")
+    ts = pd.date_range("2024-01-01", periods=4, freq="h", tz="UTC")
+    p.buy(ts[0], 0.1, 30_000.0)
+    p.record_equity(ts[0], p.equity())
+    p.buy(ts[1], 0.05, 31_000.0)
+    p.record_equity(ts[1], p.equity())
+    p.sell(ts[2], 0.15, 32_000.0, note="cierre")
+    p.record_equity(ts[2], p.equity())
+    return p
+
+
+def test_export_trades_csv(tmp_path):
+    p = make_portfolio()
+    path = p.export_trades(tmp_path / "trades.csv", fmt="csv")
+    df = pd.read_csv(path)
+    assert list(df.columns) == list(p.trades_dataframe().columns)
+    assert df["side"].tolist() == ["BUY", "BUY", "SELL"]
+
+
+def test_export_parquet_matches_dataframe(tmp_path):
+    pytest.importorskip("pyarrow")
+    p = make_portfolio()
+
+    trades = pd.read_parquet(p.export_trades(tmp_path / "trades.parquet"))
+    expected = p.trades_dataframe()
+    assert list(trades.columns) == list(expected.columns)
+    assert trades["side"].astype(str).tolist() == expected["side"].astype(str).tolist()
+    pd.testing.assert_series_equal(trades["cash_after"], expected["cash_after"])
+
+    equity = pd.read_parquet(p.export_equity_curve(tmp_path / "equity.parquet"))
+    assert equity["equity"].tolist() == p.equity_curve_dataframe()["equity"].tolist()
+
+
+def test_trades_array_matches_dataframe():
+    p = make_portfolio()
+    arr = p.trades_array()
+    df = p.trades_dataframe()
+    assert arr["side"].tolist() == df["side"].astype(str).tolist()
+    assert np.array_equal(arr["cash_after"], df["cash_after"].to_numpy())
+    assert (arr["ts"] == pd.to_datetime(df["ts"]).dt.tz_localize(None).to_numpy()).all()
+
+
+def test_empty_trades_dataframe_keeps_schema_dtypes():
+    empty = Portfolio().trades_dataframe()
+    full = make_portfolio().trades_dataframe()
+    assert empty.empty
+    assert list(empty.columns) == list(full.columns)
+    numeric = full.select_dtypes(include=["number", "category"]).columns
+    assert (empty.dtypes[numeric].astype(str) == full.dtypes[numeric].astype(str)).all()
+
+
+def test_trades_dataframe_cached_until_next_trade():
+    p = Portfolio(cash=1_000.0, fee_bps=0.0)
+    p.buy(pd.Timestamp("2024-01-01", tz="UTC"), 1.0, 100.0)
+    first = p.trades_dataframe()
+    first["pnl"] = -1.0  # modificar la copia devuelta no toca la cache
+    again = p.trades_dataframe()
+    assert again["pnl"].tolist() == [0.0]
+
+    p.sell(pd.Timestamp("2024-01-02", tz="UTC"), 1.0, 110.0)
+    assert len(p.trades_dataframe()) == 2
+
+
+def test_run_meta_follows_rule_changes_and_unrecorded_rows():
+    p = Portfolio(cash=10_000.0, fee_bps=10.0, run_id="r1")
+    ts = pd.date_range("2024-01-01", periods=4, freq="h", tz="UTC")
+    p.set_execution_rules(rules=None, slippage_bps=0.0)
+    p.buy(ts[0], 0.1, 30_000.0)
+    first = p.trades_dataframe()  # rellena los metadatos constantes de la fila 0
+    p.set_execution_rules(rules=None, slippage_bps=5.0)
+    p.buy(ts[1], 0.1, 30_000.0)
+    p.record_meta = False
+    p.sell(ts[2], 0.2, 31_000.0)
+
+    df = p.trades_dataframe()
+    assert first["slippage_bps"].tolist() == [0.0]
+    assert df["slippage_bps"].tolist()[:2] == [0.0, 5.0]
+    assert df["run_id"].tolist()[:2] == ["r1", "r1"] and pd.isna(df["run_id"].iloc[2])
+    assert np.isnan(df["slippage_bps"].iloc[2])
+    assert df["schema_version"].tolist() == [1, 1, 0]
+    assert df["rule_check"].tolist()[:2] == ["OK", "OK"] and pd.isna(df["rule_check"].iloc[2])
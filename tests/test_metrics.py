@@ -0,0 +1,45 @@
+# tests/test_metrics.py
+"""
+Max drawdown de `metrics`: el kernel de una pasada (`_max_drawdown_kernel`, Python puro
+sin Numba) y el camino NumPy (`_max_drawdown`) deben coincidir con la referencia pandas
+`(equity / equity.cummax() - 1).min()`, también con NaN en la curva y con pico 0.0.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.volmicro.metrics import _max_drawdown, _max_drawdown_kernel
+
+
+def reference_max_drawdown(equity: np.ndarray) -> float:
+    s = pd.Series(equity)
+    return float(((s / s.cummax()) - 1.0).min()) if len(s) else np.nan
+
+
+@pytest.mark.parametrize("with_nan", [False, True])
+def test_max_drawdown_matches_pandas(with_nan):
+    rng = np.random.default_rng(3)
+    equity = 10_000 * np.cumprod(1 + rng.normal(0, 0.01, 5_000))
+    if with_nan:
+        equity[rng.choice(len(equity), 50, replace=False)] = np.nan
+
+    expected = reference_max_drawdown(equity)
+    assert _max_drawdown(equity) == pytest.approx(expected, abs=1e-15)
+    assert _max_drawdown_kernel(equity) == pytest.approx(expected, abs=1e-15)
+
+
+def test_max_drawdown_empty_is_nan():
+    assert np.isnan(_max_drawdown(np.array([])))
+
+
+@pytest.mark.parametrize(
+    "equity",
+    [[0.0, 0.0, 1.0, 0.5], [0.0, -1.0, 2.0, 1.0], [np.nan, 0.0, 0.0], [-0.0, -2.0, 1.0]],
+)
+def test_max_drawdown_zero_peak_matches_pandas(equity):
+    # Pico 0.0: pandas da NaN (0/0, se ignora) o ±inf; el kernel no debe dividir por cero
+    equity = np.array(equity)
+    expected = reference_max_drawdown(equity)
+    assert _max_drawdown(equity) == pytest.approx(expected, nan_ok=True)
+    assert _max_drawdown_kernel(equity) == pytest.approx(expected, nan_ok=True)
@@ -0,0 +1,166 @@
+# tests/test_rules.py
+"""
+Parseo de `exchangeInfo` a `SymbolRules` (sin red: respuestas sintéticas).
+
+- `parse_many` (índice por símbolo) debe dar las mismas reglas que el parseo individual.
+- Un símbolo ausente sigue siendo un `ValueError`.
+- `load_symbols_rules` descarga los símbolos sin cache en una sola petición (cliente
+  falso, caches en `tmp_path`), o en paralelo uno a uno si el lote no está disponible.
+- La cache es el `SymbolRules` picklado (`.pkl`); las caches JSON (`.json`, `.json.zst`
+  con zstandard) anteriores se siguen leyendo. `raw_filters` solo se guarda con
+  `INCLUDE_RAW_FILTERS_IN_CACHE`; si está, `from_json` deriva los campos de ahí.
+"""
+
+import pickle
+from decimal import Decimal
+
+import pytest
+
+from src.volmicro import binance_client
+from src.volmicro import rules as rules_mod
+from src.volmicro.rules import _parse_symbol_rules_from_exchange_info, parse_many
+
+
+def make_exchange_info(n: int = 50) -> dict:
+    return {
+        "symbols": [
+            {
+                "symbol": f"SYM{i}USDT",
+                "filters": [
+                    {"filterType": "PRICE_FILTER", "tickSize": "0.01000000"},
+                    {
+                        "filterType": "LOT_SIZE",
+                        "stepSize": "0.00100000",
+                        "minQty": "0.00100000",
+                        "maxQty": "9000.00000000",
+                    },
+                    {"filterType": "NOTIONAL", "minNotional": f"{i + 1}.00"},
+                ],
+            }
+            for i in range(n)
+        ]
+    }
+
+
+def test_parse_many_matches_single_symbol_parse():
+    ex_info = make_exchange_info()
+    symbols = ["SYM3USDT", "SYM49USDT", "SYM0USDT"]
+    many = parse_many(ex_info, symbols)
+
+    assert list(many) == symbols
+    for sym in symbols:
+        assert many[sym] == _parse_symbol_rules_from_exchange_info(sym, ex_info)
+    assert many["SYM49USDT"].min_notional == Decimal("50.00")
+
+
+def test_missing_symbol_raises():
+    with pytest.raises(ValueError):
+        parse_many(make_exchange_info(), ["NOPE"])
+
+
+def test_load_symbols_rules_fetches_missing_in_one_call(monkeypatch, tmp_path):
+    calls = []
+
+    class FakeClient:
+        def __init__(self, testnet: bool = False) -> None:
+            pass
+
+        def exchange_info(self, symbol=None, symbols=None):
+            calls.append(symbols)
+            return make_exchange_info()
+
+    monkeypatch.setattr(binance_client, "BinanceClient", FakeClient)
+    monkeypatch.setattr(rules_mod, "_RULES_DIR", tmp_path)
+
+    first = rules_mod.load_symbols_rules(["SYM1USDT", "SYM2USDT", "SYM1USDT"], testnet=True)
+    assert list(first) == ["SYM1USDT", "SYM2USDT"]
+    assert calls == [["SYM1USDT", "SYM2USDT"]]
+    assert rules_mod._rules_cache_path("SYM2USDT").exists()
+
+    # Segunda vez: todo sale de la cache, sin más peticiones
+    again = rules_mod.load_symbols_rules(["SYM2USDT", "SYM1USDT"], testnet=True)
+    assert len(calls) == 1
+    assert again == {"SYM2USDT": first["SYM2USDT"], "SYM1USDT": first["SYM1USDT"]}
+
+
+def test_load_symbols_rules_falls_back_to_per_symbol_fetch(monkeypatch, tmp_path):
+    calls = []
+
+    class NoBatchClient:
+        def __init__(self, testnet: bool = False) -> None:
+            pass
+
+        def exchange_info(self, symbol=None, symbols=None):
+            if symbols:
+                raise RuntimeError("symbols=[...] no soportado")
+            calls.append(symbol)
+            return make_exchange_info()
+
+    monkeypatch.setattr(binance_client, "BinanceClient", NoBatchClient)
+    monkeypatch.setattr(rules_mod, "_RULES_DIR", tmp_path)
+
+    got = rules_mod.load_symbols_rules(["SYM5USDT", "SYM7USDT"], testnet=True, max_workers=2)
+    assert sorted(calls) == ["SYM5USDT", "SYM7USDT"]
+    assert [r.symbol for r in got.values()] == ["SYM5USDT", "SYM7USDT"]
+
+
+def test_zstd_cache_roundtrip(monkeypatch, tmp_path):
+    pytest.importorskip("zstandard")
+    monkeypatch.setattr(rules_mod, "_RULES_DIR", tmp_path)
+    rules = parse_many(make_exchange_info(3), ["SYM2USDT"])["SYM2USDT"]
+
+    path = tmp_path / "SYM2USDT_rules.json.zst"
+    rules_mod._write_json(path, rules.to_json())
+    assert rules_mod._existing_rules_cache("SYM2USDT") == path
+    assert rules_mod._read_rules(path) == rules
+
+
+def test_pickle_cache_roundtrip_and_json_fallback(monkeypatch, tmp_path):
+    monkeypatch.setattr(rules_mod, "_RULES_DIR", tmp_path)
+    rules = parse_many(make_exchange_info(3), ["SYM2USDT"])["SYM2USDT"]
+
+    # Cache JSON anterior: se sigue leyendo mientras no haya pickle
+    legacy = tmp_path / "SYM2USDT_rules.json"
+    rules_mod._write_json(legacy, rules.to_json())
+    assert rules_mod._existing_rules_cache("SYM2USDT") == legacy
+    assert rules_mod._read_rules(legacy) == rules
+
+    path = rules_mod._rules_cache_path("SYM2USDT")
+    assert path.name == "SYM2USDT_rules.pkl"
+    rules_mod._write_rules(path, rules)
+    assert rules_mod._existing_rules_cache("SYM2USDT") == path
+    loaded = rules_mod._read_rules(path)
+    assert loaded == rules
+    assert loaded.f64_units == rules.f64_units and loaded._pack == rules._pack
+    assert b"f64_units" not in pickle.dumps(rules)  # derivados: se recalculan al cargar
+    assert loaded.raw_filters == ()  # INCLUDE_RAW_FILTERS_IN_CACHE=False por defecto
+
+    monkeypatch.setattr(rules_mod.settings, "INCLUDE_RAW_FILTERS_IN_CACHE", True)
+    rules_mod._write_rules(path, rules)
+    assert rules_mod._read_rules(path).raw_filters == rules.raw_filters
+
+
+def test_from_json_derives_fields_from_raw_filters():
+    rules = parse_many(make_exchange_info(3), ["SYM2USDT"])["SYM2USDT"]
+    d = rules.to_json()
+    # Los campos de primer nivel son un duplicado: con raw_filters se ignoran
+    d["min_notional"] = "999"
+    assert rules_mod.SymbolRules.from_json(d).min_notional == Decimal("3.00")
+
+    slim = rules.to_json(include_raw_filters=False)
+    assert "raw_filters" not in slim
+    assert rules_mod.SymbolRules.from_json(slim) == rules
+
+
+def test_parsed_raw_filters_match_freeze_filters():
+    ex_info = make_exchange_info(1)
+    filters = ex_info["symbols"][0]["filters"]
+    rules = parse_many(ex_info, ["SYM0USDT"])["SYM0USDT"]
+    assert rules.raw_filters == rules_mod._freeze_filters({f["filterType"]: f for f in filters})
+
+    # Un filtro sin filterType no se puede indexar: se ignora
+    untyped = parse_many(
+        {"symbols": [{**ex_info["symbols"][0], "filters": [*filters, {"maxNumOrders": 200}]}]},
+        ["SYM0USDT"],
+    )["SYM0USDT"]
+    assert untyped.raw_filters == rules.raw_filters
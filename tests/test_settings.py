@@ -0,0 +1,33 @@
+# tests/test_settings.py
+"""
+`Settings.from_env()`: lee y valida el entorno una vez (rangos, intervalo inválido => "1h")
+y devuelve una instancia inmutable; los nombres del módulo son alias de sus campos.
+"""
+
+import dataclasses
+
+import pytest
+
+from src.volmicro import settings as settings_mod
+from src.volmicro.settings import Settings
+
+
+def test_from_env_validates_and_clamps(monkeypatch):
+    monkeypatch.setenv("SYMBOL", "ethusdt")
+    monkeypatch.setenv("INTERVAL", "7m")
+    monkeypatch.setenv("LIMIT", "5000")
+    monkeypatch.setenv("ALLOC_PCT", "1.5")
+    monkeypatch.setenv("FEE_BPS", "-3")
+    monkeypatch.setenv("TESTNET", "no")
+
+    s = Settings.from_env()
+    assert (s.SYMBOL, s.INTERVAL, s.LIMIT) == ("ETHUSDT", "1h", 1000)
+    assert (s.ALLOC_PCT, s.FEE_BPS, s.TESTNET) == (1.0, 0.0, False)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        s.LIMIT = 10
+
+
+def test_module_aliases_match_instance():
+    for f in dataclasses.fields(Settings):
+        assert getattr(settings_mod, f.name) == getattr(settings_mod.settings, f.name)
@@ -0,0 +1,73 @@
+# tests/test_simulate_vectorized.py
+"""
+Caminos vectorizados de `Portfolio` frente al camino barra a barra (`buy`/`sell`).
+
+- `simulate_vectorized`: para una serie de señales factible y sin reglas del exchange,
+  mismos trades (precio, fee, cash/qty tras la orden, PnL realizado) y estado final.
+- `compute_equity_curve`: misma equity curve que la registrada barra a barra.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.volmicro.portfolio import Portfolio
+
+COLS = ["side", "qty", "price", "fee", "cash_after", "qty_after", "realized_pnl"]
+
+
+def test_simulate_vectorized_matches_scalar_path():
+    rng = np.random.default_rng(3)
+    n = 500
+    prices = 30_000 + np.cumsum(rng.normal(0, 50, n))
+    ts = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC")
+
+    # Señal factible: compras pequeñas y, de vez en cuando, cierre de toda la posición
+    side = np.zeros(n, dtype=np.int8)
+    qty = np.zeros(n)
+    pos = 0.0
+    for i in range(n):
+        if i % 7 == 3:
+            side[i], qty[i] = 1, 0.01
+            pos += 0.01
+        elif i % 23 == 22 and pos > 0:
+            side[i], qty[i] = -1, pos
+            pos = 0.0
+
+    ref = Portfolio(cash=10_000.0, fee_bps=10.0, slippage_bps=5.0, realized_pnl_net_fees=True)
+    for i in np.flatnonzero(side):
+        if side[i] > 0:
+            ref.buy(ts[i], qty[i], prices[i])
+        else:
+            ref.sell(ts[i], ref.qty, prices[i])
+
+    vec = Portfolio.simulate_vectorized(
+        prices, side, qty, fee_bps=10.0, slippage_bps=5.0, ts=ts, realized_pnl_net_fees=True
+    )
+
+    got, exp = vec.trades_dataframe(), ref.trades_dataframe()
+    assert len(got) == len(exp)
+    assert got["ts"].tolist() == exp["ts"].tolist()
+    pd.testing.assert_frame_equal(got[COLS], exp[COLS], check_exact=False, rtol=1e-9)
+    assert np.isclose(vec.cash, ref.cash) and np.isclose(vec.realized_pnl, ref.realized_pnl)
+    assert np.isclose(vec.qty, ref.qty, atol=1e-12)
+    assert len(vec.equity_curve_dataframe()) == n
+
+
+def test_compute_equity_curve_matches_recorded_curve():
+    rng = np.random.default_rng(5)
+    n = 300
+    idx = pd.date_range("2024-01-01", periods=n, freq="h", tz="UTC")
+    prices = pd.Series(30_000 + np.cumsum(rng.normal(0, 50, n)), index=idx)
+
+    # Mismo orden que el engine: MTM, registrar equity y después la estrategia
+    p = Portfolio(cash=10_000.0, fee_bps=10.0, slippage_bps=5.0)
+    for i, (ts, close) in enumerate(prices.items()):
+        p.mark_to_market(close)
+        p.record_equity(ts, p.equity())
+        if i % 11 == 5:
+            p.buy(ts, 0.02, close)
+        elif i % 29 == 28 and p.qty > 0:
+            p.sell(ts, p.qty, close)
+
+    recorded = p.equity_curve_dataframe()["equity"].to_numpy()
+    np.testing.assert_allclose(p.compute_equity_curve(prices).to_numpy(), recorded, rtol=1e-12)
@@ -11,15 +11,29 @@ Asegurar que `trades.csv` exportado por una ejecución de backtest contiene:
     fee_bps ≈ 1e4 * fee / notional_after_round   (dentro de tolerancia)
 
 Este test asume que antes se ha ejecutado un backtest que dejó un `trades.csv`
-en `reports/<...>/trades.csv` o, como fallback, en la raíz del proyecto.
+en `reports/<...>/trades.csv` o, como fallback, en la raíz del proyecto. Si el engine
+escribió también `trades.parquet` (pyarrow instalado) se valida ese: esquema sin leer
+filas y solo las columnas comprobadas, con el fichero mapeado en memoria.
 """
 
+import functools
 import glob
 import os
 
+import numpy as np
 import pandas as pd
 import pytest
 
+# pyarrow es opcional (extra `parquet`): con él se prefiere `trades.parquet` y el CSV se
+# parsea en columnar con solo las columnas pedidas; sin él, el parser C de pandas.
+try:
+    import pyarrow.parquet as pq
+
+    CSV_ENGINE = "pyarrow"
+except Exception:  # pragma: no cover
+    pq = None
+    CSV_ENGINE = "c"
+
 # --------------------------------------------------------------------
 # CONTRATO: columnas obligatorias que deben existir en trades.csv
 # --------------------------------------------------------------------
@@ -57,19 +71,47 @@ REQUIRED_COLS = [
     "minNotional_used",
 ]
 
+# Versiones en conjunto para las comprobaciones de pertenencia (una diferencia de sets)
+_REQ = frozenset(REQUIRED_COLS)
+_VALID_SIDES = frozenset({"BUY", "SELL"})
 
+# Columnas cuyos valores se comprueban (el resto solo tiene que existir en la cabecera).
+CHECKED_COLS = [
+    "side",
+    "qty",
+    "price",
+    "fee",
+    "slippage_bps",
+    "notional_after_round",
+    "run_id",
+    "fee_bps",
+    "schema_version",
+    "tickSize_used",
+    "stepSize_used",
+    "minNotional_used",
+]
+
+
+@functools.lru_cache(maxsize=1)
 def find_trades_path() -> str | None:
     """
-    Localiza el `trades.csv` más reciente.
+    Localiza el export de trades más reciente.
 
     Preferencia:
-      1) reports/*/trades.csv (el más nuevo por mtime)
-      2) ./trades.csv en la raíz (fallback)
+      1) reports/*/trades.parquet (el más nuevo por mtime; solo con pyarrow)
+      2) reports/*/trades.csv (el más nuevo por mtime)
+      3) ./trades.csv en la raíz (fallback)
+
+    Memoizado: el `skipif` y el test comparten un único glob + stats por sesión (si un
+    test escribe reports nuevos, llamar a `find_trades_path.cache_clear()`).
     """
-    candidates = glob.glob("reports/*/trades.csv")
-    candidates.sort(key=lambda p: os.path.getmtime(p), reverse=True)
-    if candidates:
-        return candidates[0]
+    patterns = ["reports/*/trades.csv"]
+    if pq is not None:
+        patterns.insert(0, "reports/*/trades.parquet")
+    for pattern in patterns:
+        candidates = glob.glob(pattern)
+        if candidates:
+            return max(candidates, key=os.path.getmtime)
     if os.path.exists("trades.csv"):
         return "trades.csv"
     return None
@@ -83,14 +125,21 @@ def test_schema_and_integrity():
     assert (
         path is not None
     ), "No se pudo resolver la ruta a trades.csv (find_trades_path devolvió None)"
-    df = pd.read_csv(path)
+    is_parquet = path.endswith(".parquet")
 
     # -----------------------------
-    # 1) Columnas obligatorias
+    # 1) Columnas obligatorias (solo la cabecera / el esquema, sin leer filas)
     # -----------------------------
-    missing = [c for c in REQUIRED_COLS if c not in df.columns]
+    header = pq.read_schema(path).names if is_parquet else pd.read_csv(path, nrows=0).columns
+    missing = sorted(_REQ.difference(header))
     assert not missing, f"Faltan columnas en trades.csv: {missing}"
 
+    # Solo se cargan las columnas que se validan por valor
+    if is_parquet:
+        df = pq.read_table(path, columns=CHECKED_COLS, memory_map=True).to_pandas()
+    else:
+        df = pd.read_csv(path, engine=CSV_ENGINE, usecols=CHECKED_COLS)
+
     # -----------------------------
     # 2) No vacío
     # -----------------------------
@@ -118,13 +167,16 @@ def test_schema_and_integrity():
     # -----------------------------
     # 6) coherencia fee_bps vs fee/notional
     # -----------------------------
-    # Evitamos divisiones por cero: filtramos filas con notional_after_round > 0
-    sub = df[df["notional_after_round"] > 0].copy()
-    assert len(sub) > 0, "No hay filas con notional_after_round > 0 para verificar fee_bps"
+    # Evitamos divisiones por cero: solo filas con notional_after_round > 0 (máscara
+    # sobre arrays float64, sin copiar el frame ni crear Series intermedias)
+    notional = df["notional_after_round"].to_numpy(dtype=np.float64)
+    fee = df["fee"].to_numpy(dtype=np.float64)
+    fee_bps = df["fee_bps"].to_numpy(dtype=np.float64)
+    mask = notional > 0
+    assert mask.any(), "No hay filas con notional_after_round > 0 para verificar fee_bps"
 
-    calc_fee_bps = 1e4 * (sub["fee"] / sub["notional_after_round"])
     # tolerancia pequeña por redondeos y float; 1e-3 bps es muy estricta, pero suficiente
-    diff = (sub["fee_bps"] - calc_fee_bps).abs().max()
+    diff = np.abs(fee_bps[mask] - 1e4 * fee[mask] / notional[mask]).max()
     assert diff < 1e-3, f"fee_bps inconsistente; max |diff| = {diff}"
 
     # -----------------------------
@@ -138,7 +190,5 @@ def test_schema_and_integrity():
     assert df["slippage_bps"].notna().all(), "slippage_bps con NaN"
 
     # (opcional) side válido
-    valid_sides = set(["BUY", "SELL"])
-    assert set(df["side"].unique()).issubset(
-        valid_sides
-    ), f"Sides inesperados: {set(df['side'].unique()) - valid_sides}"
+    sides = set(df["side"].unique())
+    assert _VALID_SIDES.issuperset(sides), f"Sides inesperados: {sides - _VALID_SIDES}"